@@ -0,0 +1,164 @@
+"""
+Physics micro-benchmarks over the canned scenarios in benchmarks/scenarios.
+
+    python -m benchmarks.bench_physics             # compare with the baseline
+    python -m benchmarks.bench_physics --save      # record a new baseline
+    python -m benchmarks.bench_physics -k throw    # only the throw benchmarks
+
+Runs headless (no window is opened); exits 1 if any benchmark is slower
+than the baseline by more than the tolerance.
+"""
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from src import physics
+from src.sim import SimPuck, place_puck_nearest
+from src.scoring import ScoreKeeper
+from src.world import World
+from src.components.board import Gutter
+from src.constants import STATE_SELECTED, STATE_GUTTER
+from .harness import Benchmark, run_suite
+from . import scenarios
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+def throw_to_rest(name):
+    """The scenario's aimed throws into its board, each stepped frame by frame until everything stops."""
+    scenario = scenarios.load(name)
+    sim, state = scenarios.build_sim(scenario, thrower=True)
+    throws = scenario["throws"]
+
+    def run():
+        for (x0, y0, dx, dy) in throws:
+            sim.restore(state)
+            sim.reseed(0)
+            puck = sim.pucks[-1]
+            puck.set_pos(x0, y0)
+            sim.throw(puck, dx, dy)
+            sim.run_until_rest(fast_forward=False)
+
+    def prepare():
+        return run, len(throws)
+    return prepare
+
+def step_frames(name, frames=20):
+    """sim.step, the substep loop Shuffleboard.update runs once per frame."""
+    scenario = scenarios.load(name)
+    sim, state = scenarios.build_sim(scenario)
+    step = sim.step
+
+    def run():
+        for _ in range(frames): step()
+
+    def prepare():
+        sim.restore(state)
+        sim.reseed(0)
+        return run, frames
+    return prepare
+
+def collisions():
+    scenario = scenarios.load("collisions")
+    pairs = scenario["pairs"]
+    p1 = SimPuck("P1", scenario["puck_size"])
+    p2 = SimPuck("P2", scenario["puck_size"])
+    check = physics.check_puck_collision
+
+    def run():
+        for (x1, y1, x2, y2, dx, dy) in pairs:
+            p1.x_in = x1; p1.y_in = y1; p1.dx = dx; p1.dy = dy; p1.is_moving = True
+            p2.x_in = x2; p2.y_in = y2; p2.dx = 0.0; p2.dy = 0.0; p2.is_moving = False
+            check(p1, p2)
+
+    def prepare():
+        return run, len(pairs)
+    return prepare
+
+def score(name):
+    """ScoreKeeper.calculate_points (what the Scoreboard runs) on a full board."""
+    scenario = scenarios.load(name)
+    sim, _ = scenarios.build_sim(scenario)
+    keeper = ScoreKeeper()
+    pucks = sim.pucks
+    board_length_ft = scenario["board_length_ft"]
+    reps = 200
+
+    def run():
+        for _ in range(reps):
+            keeper.calculate_points(pucks, board_length_ft, True, False)
+
+    def prepare():
+        return run, reps
+    return prepare
+
+def _gutter(name):
+    scenario = scenarios.load(name)
+    sim, state = scenarios.build_sim(scenario)
+    gutter = Gutter(scenario["puck_size"], World(scenario["board_length_ft"]))
+    return scenario, sim, state, gutter
+
+def drag(name):
+    """Gutter.update_constraints for every mouse position of a drag through a crowded gutter."""
+    scenario, sim, state, gutter = _gutter(name)
+    path = scenario["drag"]
+
+    def prepare():
+        sim.restore(state)
+        gutter.pucks = [p for p in sim.pucks if p.state == STATE_GUTTER]
+        obstacles = [p for p in sim.pucks if p.state != STATE_GUTTER]
+        held = gutter.pucks[0]
+        held.state = STATE_SELECTED
+        held.is_selected = True
+
+        def run():
+            for (x, y) in path:
+                held.dx = x - held.x_in; held.dy = y - held.y_in
+                held.x_in = x; held.y_in = y
+                gutter.update_constraints(held, obstacles)
+        return run, len(path)
+    return prepare
+
+def place_nearest(name):
+    """sim.place_puck_nearest dropping pucks where the gutter is busiest."""
+    scenario, sim, state, gutter = _gutter(name)
+    drops = scenario["drops"]
+    bounds = gutter.world.bounds
+
+    def prepare():
+        sim.restore(state)
+        gutter.pucks = [p for p in sim.pucks if p.state == STATE_GUTTER]
+        dropped = gutter.pucks[-1]
+
+        def run():
+            for (x, y) in drops:
+                dropped.x_in = x; dropped.y_in = y
+                place_puck_nearest(dropped, gutter.pucks, bounds)
+        return run, len(drops)
+    return prepare
+
+BENCHMARKS = [
+    Benchmark("throw_to_rest/9ft/8", throw_to_rest("board_9ft_8"), samples=10),
+    Benchmark("throw_to_rest/15ft/8", throw_to_rest("board_15ft_8"), samples=10),
+    Benchmark("throw_to_rest/22ft/8", throw_to_rest("board_22ft_8"), samples=10),
+    Benchmark("throw_to_rest/9ft/100", throw_to_rest("board_9ft_100"), samples=5, warmup=1),
+    Benchmark("throw_to_rest/15ft/100", throw_to_rest("board_15ft_100"), samples=5, warmup=1),
+    Benchmark("throw_to_rest/22ft/100", throw_to_rest("board_22ft_100"), samples=5, warmup=1),
+    Benchmark("step/8", step_frames("crowd_22ft_8")),
+    Benchmark("step/100", step_frames("crowd_22ft_100")),
+    Benchmark("check_puck_collision", collisions()),
+    Benchmark("calculate_points/8", score("board_9ft_8")),
+    Benchmark("calculate_points/100", score("board_22ft_100")),
+    Benchmark("update_constraints/8", drag("gutter_9ft_8")),
+    Benchmark("update_constraints/100", drag("gutter_22ft_100")),
+    Benchmark("place_puck_nearest/8", place_nearest("gutter_9ft_8")),
+    Benchmark("place_puck_nearest/100", place_nearest("gutter_22ft_100")),
+]
+
+def main(argv=None):
+    return run_suite(BENCHMARKS, BASELINE, "Shuffleboard physics benchmarks", argv)
+
+if __name__ == "__main__":
+    sys.exit(main())
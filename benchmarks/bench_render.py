@@ -0,0 +1,163 @@
+"""
+Render benchmarks: the game's draw calls on fixed saved games, headless.
+
+    python -m benchmarks.bench_render              # compare with the baseline
+    python -m benchmarks.bench_render --save       # record a new baseline
+    python -m benchmarks.bench_render -k 2200x280  # one window size
+
+Each saved game (mid-round, game over with the scoreboard celebrating,
+options menu open) is drawn at several window sizes, i.e. several PPIs,
+with the SDL dummy video driver. Times are milliseconds per call.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+# The game reads and writes its save under the home folder; point it at a
+# scratch one so the benchmark neither sees nor touches the real save
+_HOME = tempfile.mkdtemp(prefix="shuffleboard-bench-")
+os.environ["HOME"] = _HOME
+os.environ["APPDATA"] = _HOME
+
+import pygame
+
+from src import memory
+from src.game import Shuffleboard
+from src.constants import PUCK_COLORS, REAL_BOARD_WIDTH, GUTTER_LEFT_IN, GUTTER_RIGHT_IN, GUTTER_Y_IN, \
+                          SCORE_GAP_IN, SCOREBOARD_W_IN, STATE_SELECTED, STATE_READY, STATE_THROWN, STATE_ON_BOARD
+from .harness import Benchmark, run_suite
+from .scenarios import SCENARIO_DIR
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_render.json")
+
+# Saved games are on a 15 ft table; windows that fit it at these PPIs, plus a letterboxed 1080p
+BOARD_LENGTH_FT = 15
+PPIS = (7, 10, 14)
+LETTERBOX = (1920, 1080)
+DRAWS = 10
+
+def window_sizes():
+    content_w = GUTTER_LEFT_IN + BOARD_LENGTH_FT * 12 + SCORE_GAP_IN + SCOREBOARD_W_IN + GUTTER_RIGHT_IN
+    content_h = REAL_BOARD_WIDTH + GUTTER_Y_IN * 2
+    return [(int(content_w * ppi), int(content_h * ppi)) for ppi in PPIS] + [LETTERBOX]
+
+_games = {}
+_current = [None]
+
+def load_game(save):
+    """A Shuffleboard started from one of the canned save files."""
+    if save not in _games:
+        shutil.copy(os.path.join(SCENARIO_DIR, save + ".json"), memory.get_data_path())
+        _games[save] = Shuffleboard(record=False)
+    return _games[save]
+
+def setup(save, size, menu):
+    """Loads the game and lays it out for the window size, as a resize event would."""
+    game = load_game(save)
+    if _current[0] != (save, size, menu):
+        w, h = size
+        game.screen = pygame.display.set_mode((w, h), pygame.RESIZABLE)
+        game.update_dimensions(w, h)
+        game.state = "MENU" if menu else "GAME"
+        if menu:
+            game.menu.update_layout(w, h)
+            game.menu.set_initials(game.board_length_ft, game.puck_size, game.menu.target_score)
+        game.draw()
+        _current[0] = (save, size, menu)
+    return game
+
+def repeat(fn):
+    def run():
+        for _ in range(DRAWS): fn()
+    return run
+
+def frame(save, size, menu=False):
+    """Shuffleboard.draw, everything that goes into one frame."""
+    def prepare():
+        game = setup(save, size, menu)
+        return repeat(game.draw), DRAWS
+    return prepare
+
+def background(save, size):
+    """The static table layer, rebuilt as after a resize."""
+    def prepare():
+        game = setup(save, size, False)
+        def draw():
+            game.background = None
+            game.get_background()
+        return repeat(draw), DRAWS
+    return prepare
+
+def scoreboard(save, size):
+    def prepare():
+        game = setup(save, size, False)
+        c1, c2 = PUCK_COLORS[game.menu.p1_color], PUCK_COLORS[game.menu.p2_color]
+        def draw():
+            game.scoreboard.draw(game.screen, game.screen_w, game.screen_h,
+                                 game.throws_left, game.current_turn, c1, c2,
+                                 game.game_state == "MOVING", game.game_over, game.board_length_px)
+        return repeat(draw), DRAWS
+    return prepare
+
+def shadows(save, size):
+    """Both shadow passes (in-hand and thrown pucks, then pucks on the table)."""
+    def prepare():
+        game = setup(save, size, False)
+        gutter, screen, rect = game.gutter, game.screen, game.surface_rect
+        def draw():
+            gutter.draw_puck_shadows(screen, rect, [STATE_SELECTED, STATE_READY, STATE_THROWN])
+            gutter.draw_puck_shadows(screen, rect, [STATE_ON_BOARD])
+        return repeat(draw), DRAWS
+    return prepare
+
+def pucks(save, size):
+    """The three puck layers: gutter, in play and on the table."""
+    def prepare():
+        game = setup(save, size, False)
+        gutter, screen = game.gutter, game.screen
+        def draw():
+            gutter.draw_gutter_layer(screen)
+            gutter.draw_active_layer(screen)
+            gutter.draw_edging_layer(screen)
+        return repeat(draw), DRAWS
+    return prepare
+
+def options(save, size):
+    def prepare():
+        game = setup(save, size, True)
+        return repeat(lambda: game.menu.draw(game.screen)), DRAWS
+    return prepare
+
+def build():
+    benchmarks = []
+    for (w, h) in window_sizes():
+        size = (w, h)
+        tag = f"{w}x{h}"
+        for save, state in (("save_mid_round", "mid_round"), ("save_game_over", "game_over")):
+            benchmarks += [
+                Benchmark(f"{state}/{tag}/draw", frame(save, size)),
+                Benchmark(f"{state}/{tag}/background", background(save, size)),
+                Benchmark(f"{state}/{tag}/scoreboard", scoreboard(save, size)),
+                Benchmark(f"{state}/{tag}/shadows", shadows(save, size)),
+                Benchmark(f"{state}/{tag}/pucks", pucks(save, size)),
+            ]
+        benchmarks += [
+            Benchmark(f"menu/{tag}/draw", frame("save_mid_round", size, menu=True)),
+            Benchmark(f"menu/{tag}/options", options("save_mid_round", size)),
+        ]
+    return benchmarks
+
+def main(argv=None):
+    try:
+        return run_suite(build(), BASELINE, "Shuffleboard render benchmarks", argv, unit="ms")
+    finally:
+        pygame.quit()
+        shutil.rmtree(_HOME, ignore_errors=True)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+# A benchmark is a name plus a function that prepares one sample and
+# returns (run, ops): run() is the timed part and does `ops` operations.
+# Each sample is timed on its own, so the spread of per-op times gives
+# the percentiles. A suite runs in several rounds, each measuring every
+# benchmark once, and compares the median of a benchmark's per-round p50s
+# with the baseline. A single fastest sample swings by tens of percent
+# from run to run on a busy machine, and so do back-to-back runs, since
+# the machine's speed drifts over seconds; rounds spread a benchmark's
+# runs over the whole suite.
+
+# Operations this fast are mostly timer and interpreter noise, so they
+# get a wider tolerance before counting as a regression
+FAST_OP_US = 5.0
+FAST_TOLERANCE = 0.5
+
+class Benchmark:
+    def __init__(self, name, prepare, samples=30, warmup=3):
+        self.name = name
+        self.prepare = prepare
+        self.samples = samples
+        self.warmup = warmup
+
+    def measure(self, scale=1.0):
+        samples = max(5, int(self.samples * scale))
+        per_op = []
+        total_ops = 0
+        total_time = 0.0
+        for i in range(self.warmup + samples):
+            run, ops = self.prepare()
+            t = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - t
+            if i < self.warmup: continue
+            per_op.append(elapsed / ops)
+            total_ops += ops
+            total_time += elapsed
+
+        per_op.sort()
+        return {
+            "ops_per_sec": 1.0 / percentile(per_op, 50),
+            "mean_us": total_time / total_ops * 1e6,
+            "min_us": per_op[0] * 1e6,
+            "p50_us": percentile(per_op, 50) * 1e6,
+            "p90_us": percentile(per_op, 90) * 1e6,
+            "p99_us": percentile(per_op, 99) * 1e6,
+            "samples": samples,
+        }
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values: return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+def load_baseline(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f).get("results", {})
+    except (OSError, ValueError):
+        return None
+
+def save_baseline(path, results):
+    data = {
+        "machine": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def median_run(runs):
+    """The run with the median p50."""
+    runs = sorted(runs, key=lambda r: r["p50_us"])
+    result = runs[len(runs) // 2]
+    result["repeats"] = len(runs)
+    return result
+
+def tolerance_for(base_us, tolerance):
+    return max(tolerance, FAST_TOLERANCE) if base_us < FAST_OP_US else tolerance
+
+def run_suite(benchmarks, default_baseline, description, argv=None, unit="us"):
+    """
+    Command line entry shared by the suites. Runs the benchmarks, prints a
+    table (times per op in `unit`, "us" or "ms") and compares the median
+    p50 against the baseline; returns the exit code (1 when something
+    regressed past the tolerance).
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--baseline", default=default_baseline, help="baseline JSON to compare against")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown of the median p50 before failing (default 0.25 = 25%%; "
+                             f"at least {FAST_TOLERANCE * 100:.0f}%% for operations under {FAST_OP_US:g} us)")
+    parser.add_argument("--repeats", type=int, default=3,
+                        help="rounds over the suite; each benchmark's median round counts (default 3)")
+    parser.add_argument("--quick", action="store_true", help="fewer samples and one round, for a smoke run")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline)
+    scale = 0.2 if args.quick else 1.0
+    repeats = 1 if args.quick else max(1, args.repeats)
+    selected = [b for b in benchmarks if args.filter in b.name]
+
+    scale_unit, fmt = (1e-3, ".3f") if unit == "ms" else (1.0, ".1f")
+    width = max([32] + [len(b.name) + 2 for b in selected])
+    print(f"{'benchmark':<{width}}{'ops/s':>12}{'p50 ' + unit:>11}{'p90 ' + unit:>11}{'p99 ' + unit:>11}{'vs base':>10}")
+    runs = {bench.name: [] for bench in selected}
+    for i in range(repeats - 1):
+        print(f"round {i + 1}/{repeats}", file=sys.stderr)
+        for bench in selected:
+            runs[bench.name].append(bench.measure(scale))
+
+    # The last round prints as it goes
+    results = {}
+    regressions = []
+    for bench in selected:
+        r = median_run(runs[bench.name] + [bench.measure(scale)])
+        results[bench.name] = r
+
+        change = ""
+        base = (baseline or {}).get(bench.name)
+        if base and "p50_us" in base:
+            ratio = base["p50_us"] / r["p50_us"]
+            change = f"{(ratio - 1) * 100:+.0f}%"
+            if ratio < 1 - tolerance_for(base["p50_us"], args.tolerance):
+                regressions.append((bench.name, ratio))
+                change += " !"
+        print(f"{bench.name:<{width}}{r['ops_per_sec']:>12.1f}{r['p50_us'] * scale_unit:>11{fmt}}"
+              f"{r['p90_us'] * scale_unit:>11{fmt}}{r['p99_us'] * scale_unit:>11{fmt}}{change:>10}")
+        sys.stdout.flush()
+
+    if args.json:
+        save_baseline(args.json, results)
+    if args.save:
+        merged = dict(baseline or {})
+        merged.update(results)
+        save_baseline(args.baseline, merged)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save to record one.")
+    for name, ratio in regressions:
+        print(f"REGRESSION: {name} at {ratio * 100:.0f}% of baseline speed")
+    return 1 if regressions else 0
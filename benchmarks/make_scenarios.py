@@ -0,0 +1,187 @@
+"""
+Writes the canned scenario files in benchmarks/scenarios. They are
+checked in, so this only needs running again when a scenario changes:
+
+    python -m benchmarks.make_scenarios
+"""
+import json
+import math
+import os
+import random
+
+from src.aim import solve_throw
+from src.sim import ShuffleboardSim
+from src.constants import REAL_BOARD_WIDTH, THROW_LINE_FT, DEFAULT_PUCK_SIZE, \
+                          P1, P2, PUCK_COLORS, STATE_ON_BOARD, STATE_GUTTER
+from src.world import default_bounds
+
+SCENARIO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios")
+
+def _spread(rng, count, x_range, y_range, r, taken=()):
+    """`count` non-overlapping puck centres inside the given ranges."""
+    placed = list(taken)
+    spots = []
+    while len(spots) < count:
+        x = rng.uniform(*x_range)
+        y = rng.uniform(*y_range)
+        if all(math.hypot(x - px, y - py) >= 2 * r + 0.05 for (px, py) in placed):
+            placed.append((x, y))
+            spots.append((round(x, 4), round(y, 4)))
+    return spots
+
+def board_scenario(name, board_length_ft, count, seed):
+    """`count` pucks at rest past the throw line and a list of aimed throws into them."""
+    rng = random.Random(seed)
+    r = DEFAULT_PUCK_SIZE / 2.0
+    board_in = board_length_ft * 12
+    x_range = (THROW_LINE_FT * 12 + 12, board_in - r)
+    spots = _spread(rng, count, x_range, (r, REAL_BOARD_WIDTH - r), r)
+    pucks = [[P1 if i % 2 else P2, x, y, 0.0, 0.0, False, STATE_ON_BOARD] for i, (x, y) in enumerate(spots)]
+
+    throws = []
+    while len(throws) < 4:
+        x0 = THROW_LINE_FT * 12 - 6
+        y0 = rng.uniform(r, REAL_BOARD_WIDTH - r)
+        aim = solve_throw(x0, y0, rng.uniform(board_in - 40, board_in - 2), rng.uniform(2, REAL_BOARD_WIDTH - 2))
+        if aim is None: continue
+        dx, dy, _ = aim
+        throws.append([round(x0, 4), round(y0, 4), dx, dy])
+
+    return {"name": name, "board_length_ft": board_length_ft, "puck_size": DEFAULT_PUCK_SIZE,
+            "pucks": pucks, "throws": throws}
+
+def crowd_scenario(name, board_length_ft, count, seed):
+    """`count` pucks all sliding at once, for the per-frame step cost."""
+    scenario = board_scenario(name, board_length_ft, count, seed)
+    rng = random.Random(seed + 1)
+    for p in scenario["pucks"]:
+        a = rng.uniform(0, 2 * math.pi)
+        speed = rng.uniform(1.0, 6.0)
+        p[3] = round(math.cos(a) * speed, 4)
+        p[4] = round(math.sin(a) * speed, 4)
+        p[5] = True
+    scenario["throws"] = []
+    return scenario
+
+def gutter_scenario(name, board_length_ft, count, obstacles, seed):
+    """
+    A crowded gutter: `count` pucks in hand around the table, `obstacles`
+    pucks resting on the wood, and a drag path for the held puck.
+    """
+    rng = random.Random(seed)
+    r = DEFAULT_PUCK_SIZE / 2.0
+    min_x, max_x, min_y, max_y = default_bounds(board_length_ft)
+    board_in = board_length_ft * 12
+
+    # Top and bottom gutter strips
+    hand = []
+    while len(hand) < count:
+        band = (min_y + r, -r) if len(hand) % 2 else (REAL_BOARD_WIDTH + r, max_y - r)
+        hand += _spread(rng, 1, (min_x + r, board_in), band, r, hand)
+    on_board = _spread(rng, obstacles, (THROW_LINE_FT * 12 + 2, board_in - r), (r, REAL_BOARD_WIDTH - r), r)
+
+    pucks = [[P1 if i % 2 else P2, x, y, 0.0, 0.0, False, STATE_GUTTER] for i, (x, y) in enumerate(hand)]
+    pucks += [[P1 if i % 2 else P2, x, y, 0.0, 0.0, False, STATE_ON_BOARD] for i, (x, y) in enumerate(on_board)]
+
+    # Drag from the near gutter across the throwing area and back
+    drag = []
+    for i in range(120):
+        t = i / 119.0
+        drag.append([round(-2 + t * (THROW_LINE_FT * 12 + 4), 4),
+                     round(REAL_BOARD_WIDTH / 2 + math.sin(t * 6 * math.pi) * (REAL_BOARD_WIDTH / 2 + 3), 4)])
+
+    # Drop points for place_puck_nearest, mostly where the gutter is busy
+    drops = [[round(x + rng.uniform(-1, 1), 4), round(y + rng.uniform(-1, 1), 4)]
+             for (x, y) in rng.sample(hand, min(32, len(hand)))]
+
+    return {"name": name, "board_length_ft": board_length_ft, "puck_size": DEFAULT_PUCK_SIZE,
+            "pucks": pucks, "drag": drag, "drops": drops}
+
+def collision_scenario(name, count, seed):
+    """Pairs of touching pucks with closing velocities."""
+    rng = random.Random(seed)
+    r = DEFAULT_PUCK_SIZE / 2.0
+    pairs = []
+    for _ in range(count):
+        x, y = rng.uniform(40, 100), rng.uniform(r, REAL_BOARD_WIDTH - r)
+        a = rng.uniform(0, 2 * math.pi)
+        gap = 2 * r - rng.uniform(0.01, 0.3)
+        speed = rng.uniform(0.5, 10.0)
+        pairs.append([round(x, 4), round(y, 4),
+                      round(x + math.cos(a) * gap, 4), round(y + math.sin(a) * gap, 4),
+                      round(math.cos(a) * speed, 4), round(math.sin(a) * speed, 4)])
+    return {"name": name, "puck_size": DEFAULT_PUCK_SIZE, "pairs": pairs}
+
+def _play(sim, throws, rng):
+    """Aimed throws by whoever is to move, each run until the board settles."""
+    for _ in range(throws):
+        puck = sim.next_puck()
+        x0 = THROW_LINE_FT * 12 - 6
+        y0 = rng.uniform(3, REAL_BOARD_WIDTH - 3)
+        target = (sim.board_len_in - rng.uniform(1, 30), rng.uniform(3, REAL_BOARD_WIDTH - 3))
+        dx, dy, _ = solve_throw(x0, y0, *target)
+        puck.set_pos(x0, y0)
+        sim.throw(puck, dx, dy)
+        sim.run_until_rest()
+
+def save_scenario(name, board_length_ft, throws, game_over, seed):
+    """
+    A save file in the memory.json layout, as the game would write it
+    after `throws` throws of a seeded game. With game_over, the round is
+    played out from 18-14 until a seed finishes the game, so the pucks are
+    still on the table and the scoreboard is celebrating.
+    """
+    while True:
+        rng = random.Random(seed)
+        sim = ShuffleboardSim(board_length_ft, seed=seed)
+        sim.reset_game()
+        scores = sim.scores
+        if game_over:
+            scores.p1_score, scores.p2_score = 18, 14
+        _play(sim, throws, rng)
+        if sim.game_over or not game_over: break
+        seed += 1
+
+    colors = {P1: "Red", P2: "Blue"}
+    return {
+        "settings": {"length": board_length_ft, "puck_size": DEFAULT_PUCK_SIZE, "ppi": 7.0,
+                     "window_width": 1000, "window_height": 196, "target_score": 21, "edging": True,
+                     "p1_color_name": colors[P1], "p2_color_name": colors[P2]},
+        "scores": {"p1_score": scores.p1_score, "p2_score": scores.p2_score,
+                   "round_p1": scores.round_points[P1], "round_p2": scores.round_points[P2],
+                   "game_winner": scores.game_winner},
+        "gameplay": {"current_turn": sim.current_turn, "round_winner": sim.round_winner,
+                     "throws_left_p1": sim.throws_left[P1], "throws_left_p2": sim.throws_left[P2],
+                     "game_over": sim.game_over, "game_state": sim.game_state,
+                     "state_timer_active": False},
+        "pucks": [{"owner": p.owner, "x_in": round(p.x_in, 4), "y_in": round(p.y_in, 4),
+                   "dx": 0, "dy": 0, "is_moving": False, "state": p.state,
+                   "color": list(PUCK_COLORS[colors[p.owner]])} for p in sim.pucks],
+        "name": name,
+    }
+
+def all_scenarios():
+    scenarios = []
+    for ft in (9, 15, 22):
+        scenarios.append(board_scenario(f"board_{ft}ft_8", ft, 7, seed=ft))
+        scenarios.append(board_scenario(f"board_{ft}ft_100", ft, 99, seed=100 + ft))
+    scenarios.append(crowd_scenario("crowd_22ft_8", 22, 8, seed=8))
+    scenarios.append(crowd_scenario("crowd_22ft_100", 22, 100, seed=100))
+    scenarios.append(gutter_scenario("gutter_9ft_8", 9, 8, 8, seed=9))
+    scenarios.append(gutter_scenario("gutter_22ft_100", 22, 100, 30, seed=22))
+    scenarios.append(collision_scenario("collisions", 256, seed=1))
+    scenarios.append(save_scenario("save_mid_round", 15, 5, False, seed=5))
+    scenarios.append(save_scenario("save_game_over", 15, 8, True, seed=8))
+    return scenarios
+
+def main():
+    os.makedirs(SCENARIO_DIR, exist_ok=True)
+    for scenario in all_scenarios():
+        path = os.path.join(SCENARIO_DIR, scenario["name"] + ".json")
+        with open(path, 'w') as f:
+            json.dump(scenario, f, separators=(",", ":"))
+            f.write("\n")
+        print(path)
+
+if __name__ == "__main__":
+    main()
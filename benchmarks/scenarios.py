@@ -0,0 +1,40 @@
+import json
+import os
+
+from src.sim import ShuffleboardSim, GameState
+from src.constants import P1, STATE_READY
+
+SCENARIO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios")
+
+def load(name):
+    with open(os.path.join(SCENARIO_DIR, name + ".json"), 'r') as f:
+        return json.load(f)
+
+def game_state(scenario, thrower=False):
+    """
+    GameState with the scenario's pucks on the table, P1 to throw. With
+    thrower, one more P1 puck is added last for the scenario's throws.
+    """
+    state = GameState()
+    state.settings = (scenario["board_length_ft"], scenario["puck_size"], 21, True)
+    state.pucks = [(owner, x, y, dx, dy, moving, puck_state, not moving)
+                   for (owner, x, y, dx, dy, moving, puck_state) in scenario["pucks"]]
+    if thrower:
+        state.pucks.append((P1, 0.0, 0.0, 0.0, 0.0, False, STATE_READY, False))
+    state.throws_left = (4, 4)
+    state.current_turn = P1
+    state.round_winner = P1
+    state.game_over = False
+    state.game_state = "MOVING" if any(p[5] for p in scenario["pucks"]) else "AIMING"
+    state.round_delay_left = 0
+    state.frame = 0
+    state.round_number = 1
+    state.scores = (0, 0, 0, 0, None)
+    state.rng_state = None
+    return state
+
+def build_sim(scenario, thrower=False, **kwargs):
+    """A headless sim holding the scenario, plus the state to restore before each sample."""
+    state = game_state(scenario, thrower)
+    sim = ShuffleboardSim.from_state(state, seed=0, **kwargs)
+    return sim, state
@@ -13,5 +13,8 @@ if current_dir not in sys.path:
 from src.game import Shuffleboard
 
 if __name__ == "__main__":
-    game = Shuffleboard()
+    # SHUFFLEBOARD_PROFILE_CSV=frames.csv streams per-frame phase timings;
+    # a snapshot path as the argument opens that position instead of the autosave
+    game = Shuffleboard(profile_csv=os.environ.get("SHUFFLEBOARD_PROFILE_CSV"),
+                        snapshot=sys.argv[1] if len(sys.argv) > 1 else None)
     game.run()
\ No newline at end of file
@@ -0,0 +1,65 @@
+import math
+from . import physics
+from .constants import TABLE_FRICTION, MIN_SPEED, MAX_POWER
+
+def solve_speed(distance, friction=TABLE_FRICTION):
+    """
+    Release speed that makes a free puck travel `distance` inches.
+    Returns (speed, exact). Because a puck stops abruptly once it drops
+    below MIN_SPEED, some distances (gaps of about MIN_SPEED inches) cannot
+    be hit exactly; then the closest reachable speed is returned.
+    """
+    if distance <= 0:
+        return 0.0, True
+
+    # Any puck stops with speed * f^n in [MIN_SPEED * f, MIN_SPEED), which
+    # pins the release speed to within MIN_SPEED * (1 - f) of this guess
+    guess = distance * (1 - friction) + MIN_SPEED
+    n0 = physics.frames_to_stop(guess, friction)
+
+    best = None
+    for n in range(max(1, n0 - 2), n0 + 3):
+        travel = physics.travel_factor(n, friction)
+        lo = MIN_SPEED / friction ** (n - 1) if n > 1 else 0.0
+        hi = MIN_SPEED / friction ** n
+
+        speed = distance / travel
+        if lo <= speed < hi:
+            return speed, True
+
+        speed = min(max(speed, lo), math.nextafter(hi, 0))
+        err = abs(speed * travel - distance)
+        if best is None or err < best[0]:
+            best = (err, speed)
+    return best[1], False
+
+def solve_throw(start_x, start_y, target_x, target_y, friction=TABLE_FRICTION, max_power=MAX_POWER):
+    """
+    Release velocity (dx, dy) that stops a puck thrown from (start_x, start_y)
+    at (target_x, target_y), assuming nothing is in the way.
+    Returns (dx, dy, exact), or None if the target needs more than max_power.
+    """
+    vx = target_x - start_x
+    vy = target_y - start_y
+    distance = math.hypot(vx, vy)
+    if distance == 0:
+        return 0.0, 0.0, True
+
+    speed, exact = solve_speed(distance, friction)
+    if speed > max_power:
+        return None
+    return vx / distance * speed, vy / distance * speed, exact
+
+def solve_throws(start, targets, friction=TABLE_FRICTION, max_power=MAX_POWER):
+    """Batched solve_throw from one release point to many (x, y) targets."""
+    start_x, start_y = start
+    return [solve_throw(start_x, start_y, tx, ty, friction, max_power) for (tx, ty) in targets]
+
+def path_is_clear(sim, puck, target_x, target_y):
+    """True if a puck sliding straight to the target would not touch anything it collides with."""
+    for other in sim.pucks:
+        if other is puck or not sim.should_collide(puck, other): continue
+        if not physics.segment_clears_point(puck.x_in, puck.y_in, target_x, target_y,
+                                            other.x_in, other.y_in, puck.radius_in + other.radius_in):
+            return False
+    return True
@@ -0,0 +1,345 @@
+import math
+import numpy as np
+from .sim import SUB_STEPS
+from .world import default_bounds
+from .scoring import LINE_3_IN, LINE_2_IN, LINE_1_IN
+from .constants import REAL_BOARD_WIDTH, FOUL_LINE_FT, DEFAULT_LENGTH_FT, DEFAULT_PUCK_SIZE, \
+                       TABLE_FRICTION, MIN_SPEED, STATE_THROWN, STATE_ON_BOARD, P1
+
+# Boards stepped together; bounds the size of the per-step temporaries
+BOARD_CHUNK = 4096
+
+class BatchSim:
+    """
+    Struct-of-arrays physics for B independent tables with N pucks each.
+
+    Only pucks that are in play (thrown or resting on the wood) are
+    simulated; a puck that falls off the table is parked, exactly as the
+    gutter state keeps it from touching table pucks in ShuffleboardSim.
+    Every array is shaped (B, N) and all boards advance together.
+
+    Collisions use the same positional correction and impulse as
+    physics.check_puck_collision, but every contact in a substep is solved
+    at once instead of pair by pair (each puck gets the summed pushes of
+    its pairs), and only pairs with a moving puck count, so pile-ups can
+    differ from the scalar engine in the last few decimals. Boards where
+    nothing moves are skipped.
+    """
+    def __init__(self, num_boards, num_pucks=8, board_length_ft=DEFAULT_LENGTH_FT,
+                 puck_size=DEFAULT_PUCK_SIZE, bounds=None, seed=None):
+        self.num_boards = num_boards
+        self.num_pucks = num_pucks
+        self.board_length_ft = board_length_ft
+        self.radius = puck_size / 2.0
+        self.bounds = bounds or default_bounds(board_length_ft)
+        self.rng = np.random.default_rng(seed)
+
+        shape = (num_boards, num_pucks)
+        self.x = np.zeros(shape)
+        self.y = np.zeros(shape)
+        self.dx = np.zeros(shape)
+        self.dy = np.zeros(shape)
+        self.in_play = np.zeros(shape, dtype=bool)
+        self.moving = np.zeros(shape, dtype=bool)
+        self.owner = np.zeros(shape, dtype=np.int8) # 0 = P1, 1 = P2
+        self._pairs = None
+
+    @property
+    def board_len_in(self):
+        return self.board_length_ft * 12
+
+    def reset(self):
+        for arr in (self.x, self.y, self.dx, self.dy):
+            arr.fill(0)
+        self.in_play.fill(False)
+        self.moving.fill(False)
+
+    def load_pucks(self, pucks, boards=slice(None)):
+        """Copies puck objects (SimPuck / Puck) into the given boards."""
+        for k, p in enumerate(pucks[:self.num_pucks]):
+            self.x[boards, k] = p.x_in
+            self.y[boards, k] = p.y_in
+            self.dx[boards, k] = p.dx
+            self.dy[boards, k] = p.dy
+            self.in_play[boards, k] = p.state in (STATE_THROWN, STATE_ON_BOARD)
+            self.moving[boards, k] = p.is_moving and p.state in (STATE_THROWN, STATE_ON_BOARD)
+            self.owner[boards, k] = 0 if p.owner == P1 else 1
+
+    def throw(self, puck_index, x_in, y_in, dx, dy, boards=slice(None)):
+        """Releases puck `puck_index` on each board; arguments may be scalars or (B,) arrays."""
+        self.x[boards, puck_index] = x_in
+        self.y[boards, puck_index] = y_in
+        self.dx[boards, puck_index] = dx
+        self.dy[boards, puck_index] = dy
+        self.in_play[boards, puck_index] = True
+        self.moving[boards, puck_index] = True
+
+    def step(self):
+        """Advances every board by one frame. Returns the moving puck count per board."""
+        moving_count = np.zeros(self.num_boards, dtype=np.int64)
+        # Boards at rest are left out; the rest go through in chunks
+        active = np.flatnonzero((self.moving & self.in_play).any(axis=1))
+        if len(active) == self.num_boards:
+            chunks = [slice(start, start + BOARD_CHUNK) for start in range(0, self.num_boards, BOARD_CHUNK)]
+        else:
+            chunks = [active[start:start + BOARD_CHUNK] for start in range(0, len(active), BOARD_CHUNK)]
+        for boards in chunks:
+            moving_count[boards] = self._step_boards(boards)
+        return moving_count
+
+    def _step_boards(self, boards):
+        """One frame for a chunk of boards, worked on as copies and written back."""
+        r = self.radius
+        x, y, dx, dy = self.x[boards], self.y[boards], self.dx[boards], self.dy[boards]
+        in_play, moving = self.in_play[boards], self.moving[boards]
+
+        # Only boards where a contact is possible this frame pay for collisions
+        near = np.flatnonzero(self._may_touch(x, y, dx, dy, in_play, moving))
+        self._substeps(x, y, dx, dy, in_play, moving, near)
+
+        # --- END OF FRAME: stability, friction, clamping ---
+        b_min_x, b_max_x, b_min_y, b_max_y = self.bounds
+        board_len_in = self.board_len_in
+        tol = r * .22
+        stable = (x >= -tol) & (x <= board_len_in + tol) & (y >= -tol) & (y <= REAL_BOARD_WIDTH + tol)
+        fell = in_play & ~stable
+        if fell.any():
+            in_play &= ~fell
+            moving &= ~fell
+            dx[fell] = 0
+            dy[fell] = 0
+
+        moving &= in_play
+        moving_count = moving.sum(axis=1)
+
+        np.multiply(dx, TABLE_FRICTION, out=dx, where=moving)
+        np.multiply(dy, TABLE_FRICTION, out=dy, where=moving)
+        stopped = moving & (np.hypot(dx, dy) < MIN_SPEED)
+        dx[stopped] = 0
+        dy[stopped] = 0
+        moving &= ~stopped
+
+        lo_x, hi_x = b_min_x + r, b_max_x - r
+        lo_y, hi_y = b_min_y + r, b_max_y - r
+        dx[(x < lo_x) | (x > hi_x)] = 0.0
+        dy[(y < lo_y) | (y > hi_y)] = 0.0
+        np.clip(x, lo_x, hi_x, out=x)
+        np.clip(y, lo_y, hi_y, out=y)
+
+        self.x[boards], self.y[boards], self.dx[boards], self.dy[boards] = x, y, dx, dy
+        self.in_play[boards], self.moving[boards] = in_play, moving
+        return moving_count
+
+    def _substeps(self, x, y, dx, dy, in_play, moving, near):
+        """The frame's substeps; collisions are only looked for on the `near` rows."""
+        r = self.radius
+        b_min_x, b_max_x, b_min_y, b_max_y = self.bounds
+        lo_x, hi_x, lo_y, hi_y = b_min_x + r, b_max_x - r, b_min_y + r, b_max_y - r
+        state = (x, y, dx, dy, in_play, moving)
+        # The per-substep moves only change after a bounce or a contact
+        m = moving & in_play
+        step_x = np.where(m, dx, 0.0) / SUB_STEPS
+        step_y = np.where(m, dy, 0.0) / SUB_STEPS
+        for _ in range(SUB_STEPS):
+            x += step_x
+            y += step_y
+            # Everything starts the frame inside the walls, so min/max tell if anything left
+            if x.min() < lo_x or x.max() > hi_x or y.min() < lo_y or y.max() > hi_y:
+                self._bounce(x, y, dx, dy, m, lo_x, hi_x, lo_y, hi_y)
+                step_x = np.where(m, dx, 0.0) / SUB_STEPS
+                step_y = np.where(m, dy, 0.0) / SUB_STEPS
+            if len(near):
+                part = [a[near] for a in state]
+                if self._collide(*part):
+                    for a, sub in zip(state, part):
+                        a[near] = sub
+                    m[near] = part[5] & part[4]
+                    step_x[near] = np.where(m[near], part[2], 0.0) / SUB_STEPS
+                    step_y[near] = np.where(m[near], part[3], 0.0) / SUB_STEPS
+
+    def _may_touch(self, x, y, dx, dy, in_play, moving):
+        """
+        Per board, whether any contact can happen this frame. Until the
+        first contact nothing speeds up or starts moving, so a pair with a
+        moving puck closes by at most both pucks' speeds in one frame.
+        """
+        to_pairs, pair_sum = self._pair_tables()[2:]
+        # A hair over the speed covers rounding in the substep sums, and
+        # keeps pairs of two resting pucks (reach exactly 2r) out
+        speed = np.hypot(dx, dy)
+        speed += 1e-9
+        speed *= moving & in_play
+        reach = speed @ pair_sum
+        reach += self.radius * 2
+        reach *= reach
+        dist_sq = x @ to_pairs
+        dist_sq *= dist_sq
+        ddy = y @ to_pairs
+        ddy *= ddy
+        dist_sq += ddy
+        close = (dist_sq < reach) & (reach > (self.radius * 2) ** 2)
+        return close.any(axis=1)
+
+    def _bounce(self, x, y, dx, dy, m, lo_x, hi_x, lo_y, hi_y, bounce_factor=-0.6):
+        for pos, vel, lo, hi in ((x, dx, lo_x, hi_x), (y, dy, lo_y, hi_y)):
+            out = m & ((pos < lo) | (pos > hi))
+            if out.any():
+                np.clip(pos, lo, hi, out=pos, where=out)
+                vel[out] *= bounce_factor
+
+    def _pair_tables(self):
+        """
+        Every puck pair (i < j) once: index arrays, an (N, pairs) matrix
+        that turns per-puck values into i - j per pair (and, transposed,
+        adds a per-pair push to puck i and takes it from puck j), and its
+        absolute value for i + j.
+        """
+        if self._pairs is None:
+            n = self.num_pucks
+            pi, pj = np.triu_indices(n, 1)
+            to_pairs = np.zeros((n, len(pi)))
+            to_pairs[pi, np.arange(len(pi))] = 1.0
+            to_pairs[pj, np.arange(len(pi))] = -1.0
+            self._pairs = (pi, pj, to_pairs, np.abs(to_pairs))
+        return self._pairs
+
+    def _collide(self, x, y, dx, dy, in_play, moving):
+        """Resolves every contact that involves a moving puck, on all boards at once; False if there were none."""
+        pi, pj, to_pairs, pair_sum = self._pair_tables()
+        min_dist = self.radius * 2
+
+        ddx = x @ to_pairs
+        ddy = y @ to_pairs
+        dist_sq = ddx * ddx + ddy * ddy
+        m = moving & in_play
+        hit = (dist_sq < min_dist * min_dist) & in_play[:, pi] & in_play[:, pj] & (m[:, pi] | m[:, pj])
+        if not hit.any():
+            return False
+
+        dist = np.sqrt(dist_sq)
+        norm = np.where(dist > 0, dist, 1.0)
+        # Coincident centers get a random separation direction
+        same = hit & (dist == 0)
+        if same.any():
+            angle = self.rng.uniform(0, 2 * math.pi, int(same.sum()))
+            ddx[same] = np.cos(angle)
+            ddy[same] = np.sin(angle)
+            dist[same] = 0.001
+        nx = ddx / norm
+        ny = ddy / norm
+
+        # Only resolve pairs that are closing
+        vel_along_normal = (dx @ to_pairs) * nx + (dy @ to_pairs) * ny
+        hit &= vel_along_normal <= 0
+
+        percent, slop, restitution = 0.8, 0.01, 0.8
+        correction = np.where(hit, np.maximum(min_dist - dist - slop, 0) / 2 * percent, 0.0)
+        impulse = np.where(hit, -(1 + restitution) * vel_along_normal / 2, 0.0)
+
+        # Each puck gets the sum of its pairs' pushes
+        spread = to_pairs.T
+        x += (correction * nx) @ spread
+        y += (correction * ny) @ spread
+        dx += (impulse * nx) @ spread
+        dy += (impulse * ny) @ spread
+
+        woke = (hit & ((correction > 0) | (impulse != 0))) @ pair_sum.T
+        moving |= woke > 0
+        return True
+
+    def run_until_rest(self, max_frames=10000):
+        """Steps until no board has a moving puck. Returns frames used per board."""
+        frames = np.zeros(self.num_boards, dtype=np.int64)
+        active = np.ones(self.num_boards, dtype=bool)
+        for _ in range(max_frames):
+            frames += active
+            active &= self.step() > 0
+            if not active.any():
+                break
+        return frames
+
+    def score(self, edging_enabled=True):
+        """Round points (B, 2) for the current boards; see score_boards."""
+        positions = np.stack((self.x, self.y), axis=-1)
+        return score_boards(positions, self.owner, self.in_play, self.board_length_ft,
+                            self.radius * 2, edging_enabled)
+
+    def end_turn(self):
+        """Applies the foul line: pucks that did not fully cross it leave play."""
+        f_line = (self.board_length_ft - FOUL_LINE_FT) * 12
+        foul = self.in_play & ((self.x - self.radius) <= f_line)
+        self.in_play &= ~foul
+        self.moving &= ~foul
+
+def score_boards(positions, owners, in_play, board_length_ft=DEFAULT_LENGTH_FT,
+                 puck_size=DEFAULT_PUCK_SIZE, edging_enabled=True):
+    """
+    Round points for B boards at once, with the same rules as
+    ScoreKeeper.calculate_points (ties, edging, 1/2/3 zones).
+
+    positions (B, N, 2) in inches; owners (B, N) or (N,) with 0 = P1 and
+    1 = P2; in_play (B, N) marks pucks that may score (thrown or resting,
+    not in the gutter); pucks off the wood are ignored here. Returns a
+    (B, 2) int array of P1 and P2 points.
+    """
+    positions = np.asarray(positions, dtype=float)
+    x = positions[..., 0]
+    y = positions[..., 1]
+    owners = np.broadcast_to(np.asarray(owners), x.shape)
+    r = puck_size / 2.0
+    board_len_in = board_length_ft * 12
+
+    touching = (x + r >= 0) & (x - r <= board_len_in) & (y + r >= 0) & (y - r <= REAL_BOARD_WIDTH)
+    valid = np.asarray(in_play, dtype=bool) & touching
+
+    # Furthest counting puck per player; the leader scores every puck past the other's best
+    xv = np.where(valid, x, -np.inf)
+    best_p1 = np.where(owners == 0, xv, -np.inf).max(axis=-1)
+    best_p2 = np.where(owners == 1, xv, -np.inf).max(axis=-1)
+    leader = np.where(best_p1 > best_p2, 0, 1)
+    opponent_best = np.where(leader == 0, best_p2, best_p1)
+    counts = valid & (owners == leader[:, None]) & (x > opponent_best[:, None])
+
+    left_edge = board_len_in - x + r
+    pts = np.select([left_edge < LINE_3_IN, left_edge < LINE_2_IN, left_edge < LINE_1_IN], [3, 2, 1], 0)
+    if edging_enabled:
+        pts = np.where(x + r > board_len_in, 4, pts)
+    total = np.where(counts, pts, 0).sum(axis=-1)
+
+    points = np.zeros((x.shape[0], 2), dtype=np.int64)
+    points[np.arange(x.shape[0]), leader] = total
+    return points
+
+def solve_throws(start_x, start_y, target_x, target_y, friction=TABLE_FRICTION):
+    """
+    Vectorized aim.solve_throw: release velocities (dx, dy) and an `exact`
+    mask for arrays of start and target points. Targets beyond MAX_POWER
+    are not filtered here; compare np.hypot(dx, dy) against it if needed.
+    """
+    vx = np.asarray(target_x, dtype=float) - start_x
+    vy = np.asarray(target_y, dtype=float) - start_y
+    dist = np.hypot(vx, vy)
+
+    log_f = math.log(friction)
+    guess = dist * (1 - friction) + MIN_SPEED
+    n0 = np.maximum(1, np.ceil(np.log(MIN_SPEED / guess) / log_f))
+
+    speed = np.zeros_like(dist)
+    best_err = np.full_like(dist, np.inf)
+    exact = np.zeros(dist.shape, dtype=bool)
+    for off in range(-2, 3):
+        n = np.maximum(1, n0 + off)
+        travel = (1 - friction ** n) / (1 - friction)
+        lo = np.where(n > 1, MIN_SPEED / friction ** (n - 1), 0.0)
+        hi = np.nextafter(MIN_SPEED / friction ** n, 0)
+        s = np.clip(dist / travel, lo, hi)
+        err = np.abs(s * travel - dist)
+        better = err < best_err
+        speed = np.where(better, s, speed)
+        best_err = np.where(better, err, best_err)
+        exact |= err < 1e-9
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dx = np.where(dist > 0, vx / dist * speed, 0.0)
+        dy = np.where(dist > 0, vy / dist * speed, 0.0)
+    return dx, dy, exact | (dist == 0)
@@ -0,0 +1,39 @@
+import pygame
+from .. import constants
+
+# Process-wide caches. Fonts are keyed by (name, size, bold, PPI) and
+# rendered text by font key + text + color, so nothing is looked up or
+# rasterised twice. Both are dropped when the PPI changes.
+_fonts = {}
+_text = {}
+
+# Rendered labels are tiny, but slider values etc. keep producing new ones
+MAX_TEXT_ENTRIES = 512
+
+FALLBACK_FONT = "couriernew"
+
+def get_font(name, size, bold=False):
+    key = (name, size, bold, constants.PPI)
+    font = _fonts.get(key)
+    if font is None:
+        try:
+            font = pygame.font.SysFont(name, size, bold=bold)
+        except Exception:
+            font = pygame.font.SysFont(FALLBACK_FONT, size, bold=bold)
+        _fonts[key] = font
+    return font
+
+def render(name, size, text, color, bold=False):
+    """Antialiased text surface, rendered once per (font, text, color)."""
+    key = (name, size, bold, constants.PPI, text, tuple(color))
+    surf = _text.get(key)
+    if surf is None:
+        if len(_text) >= MAX_TEXT_ENTRIES:
+            _text.clear()
+        surf = get_font(name, size, bold).render(text, True, color)
+        _text[key] = surf
+    return surf
+
+def clear():
+    _fonts.clear()
+    _text.clear()
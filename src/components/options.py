@@ -4,12 +4,15 @@ import math
 from .. import constants
 from .. import physics
 from ..components.puck import Puck
+from . import fonts
 from ..constants import WHITE, BLACK, WOOD_DARK, WOOD_LIGHT, \
                         PUCK_COLORS, TABLE_FRICTION, P1, P2, \
                         STATE_READY, STATE_SELECTED, MAX_POWER
 
 class Options:
-    def __init__(self, current_length, current_puck_size):
+    def __init__(self, current_length, current_puck_size, rng=None):
+        # The menu's puck scatter is cosmetic; keep it off the game's RNG
+        self.rng = rng or random.Random()
         self.length = current_length
         self.puck_size = current_puck_size
         self.edging_enabled = True 
@@ -45,6 +48,8 @@ class Options:
         self.menu_pucks_p1 = []
         self.menu_pucks_p2 = []
         self.menu_pucks = []
+        # Menu pucks by (player, color name), kept between visits to the menu
+        self.puck_pool = {}
         
         self.handle_radius = 12
         self.dragging_slider = False
@@ -92,30 +97,44 @@ class Options:
             min_y = (rect.top - g_y) / ppi
             max_y = (rect.bottom - g_y) / ppi
             
+            placed = []
             for p in pucks:
-                # Add a small buffer so they don't spawn touching the wall
-                p.x_in = random.uniform(min_x + p.radius_in + 0.1, max_x - p.radius_in - 0.1)
-                p.y_in = random.uniform(min_y + p.radius_in + 0.1, max_y - p.radius_in - 0.1)
+                # Add a small buffer so they don't spawn touching the wall,
+                # and retry a few spots to avoid landing on another puck
+                for _ in range(20):
+                    p.x_in = self.rng.uniform(min_x + p.radius_in + 0.1, max_x - p.radius_in - 0.1)
+                    p.y_in = self.rng.uniform(min_y + p.radius_in + 0.1, max_y - p.radius_in - 0.1)
+                    if all(math.hypot(p.x_in - q.x_in, p.y_in - q.y_in) >= p.radius_in + q.radius_in
+                           for q in placed):
+                        break
                 p.dx = 0
                 p.dy = 0
+                placed.append(p)
 
         scatter(self.menu_pucks_p1, self.p1_area_rect)
         scatter(self.menu_pucks_p2, self.p2_area_rect)
         
-        # Immediate physics pass to push overlapping pucks apart
+        # Push apart whatever the sampling could not place cleanly
         for _ in range(50):
-            self._confine_pucks(self.menu_pucks_p1, self.p1_area_rect)
-            self._confine_pucks(self.menu_pucks_p2, self.p2_area_rect)
+            moved = self._confine_pucks(self.menu_pucks_p1, self.p1_area_rect)
+            moved |= self._confine_pucks(self.menu_pucks_p2, self.p2_area_rect)
+            if not moved: break
 
     def _create_puck_set(self, player_id, exclude_color):
         pucks = []
         for color_name in self.available_colors:
             if color_name == exclude_color: continue
-            p = Puck(player_id, self.puck_size, PUCK_COLORS[color_name])
-            p.color_name = color_name 
-            p.menu_group = player_id
-            p.x_in = random.uniform(1, 10)
-            p.y_in = random.uniform(1, 5)
+            p = self.puck_pool.get((player_id, color_name))
+            if p is None:
+                p = Puck(player_id, self.puck_size, PUCK_COLORS[color_name])
+                p.color_name = color_name 
+                p.menu_group = player_id
+                self.puck_pool[(player_id, color_name)] = p
+            else:
+                # A color swap may have relabelled it since
+                p.color_name = color_name
+                p.update_visuals(self.puck_size, PUCK_COLORS[color_name])
+                p.reset()
             pucks.append(p)
         return pucks
 
@@ -200,8 +219,9 @@ class Options:
             
         # Keep them confined during resizing
         for _ in range(10): 
-            self._confine_pucks(self.menu_pucks_p1, self.p1_area_rect)
-            self._confine_pucks(self.menu_pucks_p2, self.p2_area_rect)
+            moved = self._confine_pucks(self.menu_pucks_p1, self.p1_area_rect)
+            moved |= self._confine_pucks(self.menu_pucks_p2, self.p2_area_rect)
+            if not moved: break
 
     def _resize_window_to_fit(self):
         """Calculates total width based on specification and resizes window."""
@@ -215,7 +235,9 @@ class Options:
         self.update_layout(new_w, self.screen_h)
 
     def _confine_pucks(self, pucks, rect):
-        if rect.width <= 1: return
+        """Clamps pucks into the box and pushes overlapping ones apart. Returns True if any moved."""
+        if rect.width <= 1: return False
+        moved = False
         
         g_left = constants.GUTTER_PADDING_LEFT
         g_y = constants.GUTTER_PADDING_Y
@@ -228,8 +250,11 @@ class Options:
 
         # 1. Hard Wall Clamp
         for p in pucks:
-            p.x_in = max(min_x_in + p.radius_in, min(p.x_in, max_x_in - p.radius_in))
-            p.y_in = max(min_y_in + p.radius_in, min(p.y_in, max_y_in - p.radius_in))
+            x_in = max(min_x_in + p.radius_in, min(p.x_in, max_x_in - p.radius_in))
+            y_in = max(min_y_in + p.radius_in, min(p.y_in, max_y_in - p.radius_in))
+            if x_in != p.x_in or y_in != p.y_in:
+                p.x_in = x_in; p.y_in = y_in
+                moved = True
 
         # 2. Iterative Separation (The "Push" Logic)
         for i in range(len(pucks)):
@@ -250,6 +275,8 @@ class Options:
                     p1.y_in += (dy / dist) * (overlap * 0.5)
                     p2.x_in -= (dx / dist) * (overlap * 0.5)
                     p2.y_in -= (dy / dist) * (overlap * 0.5)
+                    moved = True
+        return moved
 
     def handle_event(self, event):
         m_pos = pygame.mouse.get_pos()
@@ -394,7 +421,7 @@ class Options:
     
     def _draw_btn(self, screen, rect, text):
         pygame.draw.rect(screen, WOOD_LIGHT, rect, border_radius=8)
-        lbl = self.btn_font.render(text, True, BLACK)
+        lbl = fonts.render("arial", self.btn_font_size, text, BLACK, bold=True)
         screen.blit(lbl, lbl.get_rect(center=rect.center))
 
     def _draw_practice_table(self, screen, rect):
@@ -437,14 +464,13 @@ class Options:
                 physics.resolve_rect_container(p, *constraints)
             
             # 2. Check for collisions immediately after the tiny move
-            for i in range(len(self.menu_pucks)):
+            for (i, j) in physics.candidate_pairs(self.menu_pucks):
                 p1 = self.menu_pucks[i]
-                for j in range(i + 1, len(self.menu_pucks)):
-                    p2 = self.menu_pucks[j]
-                    
-                    # Only collide if they are in the same box (same player group)
-                    if p1.menu_group == p2.menu_group:
-                        physics.check_puck_collision(p1, p2)
+                p2 = self.menu_pucks[j]
+
+                # Only collide if they are in the same box (same player group)
+                if p1.menu_group == p2.menu_group:
+                    physics.check_puck_collision(p1, p2, self.rng)
 
         # --- FINAL PASS: FRICTION ---
         # Apply friction only ONCE per frame
@@ -454,18 +480,19 @@ class Options:
 
     def update_fonts(self):
         scale = constants.PPI / 10.0
-        self.small_label_font = pygame.font.SysFont("arial", int(18 * scale), bold=True)
-        self.btn_font = pygame.font.SysFont("arial", int(14 * scale), bold=True)
-        self.font = pygame.font.SysFont("arial", int(20 * scale), bold=True)
+        self.small_label_size = int(18 * scale)
+        self.btn_font_size = int(14 * scale)
+        self.small_label_font = fonts.get_font("arial", self.small_label_size, bold=True)
+        self.btn_font = fonts.get_font("arial", self.btn_font_size, bold=True)
+        self.font = fonts.get_font("arial", int(20 * scale), bold=True)
 
     def draw(self, screen):
         self.update_fonts()
-        self.update_physics()
         screen.fill(WOOD_DARK)
         
         # --- Labels ---
         lbl_y = self.slider_rect.top - int(1.5 * constants.PPI)
-        len_lbl = self.small_label_font.render(f"Table Length: {int(self.length)} Ft", True, WHITE)
+        len_lbl = fonts.render("arial", self.small_label_size, f"Table Length: {int(self.length)} Ft", WHITE, bold=True)
         screen.blit(len_lbl, len_lbl.get_rect(center=(self.slider_rect.centerx, lbl_y)))
         
         # --- Slider ---
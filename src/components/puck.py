@@ -1,43 +1,74 @@
 import pygame
 import math
 from .. import constants
-from ..constants import MIN_SPEED, LINE_WIDTH, \
-                        STATE_GUTTER, STATE_THROWN, STATE_ON_BOARD, STATE_READY, STATE_SELECTED, \
-                        P1, BLACK
+from ..sim import SimPuck
+from . import fonts
+from ..constants import MIN_SPEED, LINE_WIDTH, P1, BLACK
 
-class Puck:
+# Rendered pucks shared by every Puck, keyed by (color, radius_px, highlighted).
+# radius_px already carries the PPI; the cache is dropped when the PPI changes.
+_sprites = {}
+MAX_SPRITES = 256
+
+# Room for the highlight ring around the body
+HIGHLIGHT_PX = 3
+
+def get_sprite(color, radius_px, highlighted):
+    key = (color, radius_px, highlighted)
+    sprite = _sprites.get(key)
+    if sprite is None:
+        if len(_sprites) >= MAX_SPRITES:
+            _sprites.clear()
+        c = radius_px + HIGHLIGHT_PX
+        sprite = pygame.Surface((c * 2 + 1, c * 2 + 1), pygame.SRCALPHA)
+        if highlighted:
+            pygame.draw.circle(sprite, (255, 255, 255), (c, c), radius_px + HIGHLIGHT_PX)
+        pygame.draw.circle(sprite, color, (c, c), radius_px)
+        pygame.draw.circle(sprite, BLACK, (c, c), radius_px, LINE_WIDTH)
+        _sprites[key] = sprite
+    return sprite
+
+def clear_sprites():
+    _sprites.clear()
+
+# How far between the last two physics ticks the frame being drawn is (0-1)
+_render_alpha = 1.0
+
+def set_render_alpha(alpha):
+    global _render_alpha
+    _render_alpha = alpha
+
+class Puck(SimPuck):
     def __init__(self, owner, diameter, color_rgb, font="couriernew", text_color=BLACK):
-        self.owner = owner 
+        super().__init__(owner, diameter, color_rgb)
         self.update_visuals(diameter, color_rgb)
+
+        # Position at the start of the latest physics tick, to draw moving pucks in between
+        self.prev_x_in = self.x_in
+        self.prev_y_in = self.y_in
         
         # Visual settings (stored for memory saving)
         self.font_name = font
         self.text_color = text_color
-        
-        # Physics State
-        self.x_in = 0
-        self.y_in = 0
-        self.dx = 0
-        self.dy = 0
-        self.is_moving = False
-        self.state = STATE_GUTTER 
-        
-        # Interaction State
-        self.highlighted = False 
-        self.is_selected = False
 
     def update_visuals(self, diameter, color_rgb):
         self.radius_in = diameter / 2.0
         self.radius_px = int(self.radius_in * constants.PPI)
         self.color = color_rgb
 
-    def set_pos(self, x_in, y_in):
-        self.x_in = x_in
-        self.y_in = y_in
+    def remember_pos(self):
+        """Called before each physics tick."""
+        self.prev_x_in = self.x_in
+        self.prev_y_in = self.y_in
 
     def get_screen_pos(self):
-        px = int(constants.GUTTER_PADDING_LEFT + (self.x_in * constants.PPI))
-        py = int(constants.GUTTER_PADDING_Y + (self.y_in * constants.PPI))
+        x_in, y_in = self.x_in, self.y_in
+        # A sliding puck is drawn where it is between ticks; anything else where it is
+        if self.is_moving and _render_alpha < 1.0:
+            x_in = self.prev_x_in + (x_in - self.prev_x_in) * _render_alpha
+            y_in = self.prev_y_in + (y_in - self.prev_y_in) * _render_alpha
+        px = int(constants.GUTTER_PADDING_LEFT + (x_in * constants.PPI))
+        py = int(constants.GUTTER_PADDING_Y + (y_in * constants.PPI))
         return pygame.math.Vector2(px, py)
 
     def update(self, friction, bounds_in):
@@ -60,8 +91,6 @@ class Puck:
         # Highlight Logic
         # UPDATED: Remove valid_highlight_state restriction. 
         # Trust that input.py only sets highlighted=True when appropriate.
-        if self.highlighted:
-            pygame.draw.circle(screen, (255, 255, 255), (int(pos.x), int(pos.y)), self.radius_px + 3)
 
         # Draw Puck Body
         draw_color = self.color
@@ -69,19 +98,14 @@ class Puck:
         if self.color == self.text_color:
             draw_color = (50, 50, 50)
 
-        pygame.draw.circle(screen, draw_color, (int(pos.x), int(pos.y)), self.radius_px)
-        pygame.draw.circle(screen, BLACK, (int(pos.x), int(pos.y)), self.radius_px, LINE_WIDTH)
+        sprite = get_sprite(tuple(draw_color), self.radius_px, bool(self.highlighted))
+        c = self.radius_px + HIGHLIGHT_PX
+        screen.blit(sprite, (int(pos.x) - c, int(pos.y) - c))
 
         # Draw Text
-        font_size = int(1.1 * ppi)
-        try:
-            puck_font = pygame.font.SysFont(self.font_name, font_size, bold=True)
-        except:
-            puck_font = pygame.font.SysFont("couriernew", font_size, bold=True)
-        
         display_num = "" if self.owner == P1 else ""
-        
+
         if display_num:
-            text_surf = puck_font.render(display_num, True, self.text_color)
+            text_surf = fonts.render(self.font_name, int(1.1 * ppi), display_num, self.text_color, bold=True)
             text_rect = text_surf.get_rect(center=(int(pos.x), int(pos.y)))
             screen.blit(text_surf, text_rect)
\ No newline at end of file
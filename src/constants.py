@@ -27,6 +27,7 @@ GUTTER_LEFT_IN = 10.0
 SCORE_GAP_IN = 4.0
 GUTTER_RIGHT_IN = 5.0
 GUTTER_Y_IN = 4
+SCOREBOARD_W_IN = 21.0
 
 GUTTER_PADDING_LEFT = int(GUTTER_LEFT_IN * PPI)
 GUTTER_PADDING_RIGHT = int(GUTTER_RIGHT_IN * PPI)
@@ -37,7 +38,9 @@ GUTTER_PADDING_Y = int(GUTTER_Y_IN * PPI)
 ICON_SIZE_IN = 2.5 
 ICON_SIZE_PX = int(ICON_SIZE_IN * PPI)
 
-FPS = 60
+# Display frame cap only; physics always ticks at PHYSICS_HZ, so changing
+# this never changes how far a throw goes
+RENDER_FPS_CAP = 60
 
 # Colors
 WHITE = (240, 240, 240)
@@ -70,6 +73,10 @@ PUCK_COLORS = {
 }
 
 # Physics
+# Friction, speeds and timers are per physics tick, at a fixed rate
+PHYSICS_HZ = 60
+# After a hitch the game catches up at most this many ticks, then lets the time go
+MAX_CATCH_UP_TICKS = 5
 TABLE_FRICTION = 0.985 
 GUTTER_FRICTION = 0.85 
 MIN_SPEED = 0.05
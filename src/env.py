@@ -0,0 +1,102 @@
+import math
+from .sim import ShuffleboardSim, ENGINE_SUBSTEP
+from .constants import DEFAULT_LENGTH_FT, DEFAULT_PUCK_SIZE, REAL_BOARD_WIDTH, THROW_LINE_FT, \
+                       MAX_POWER, STATE_ON_BOARD, STATE_THROWN, P1, P2
+
+class ShuffleboardEnv:
+    """
+    Gymnasium-style wrapper around ShuffleboardSim.
+
+    One step is one throw by the player to move: the puck is released at
+    (x_in, y_in) with velocity (dx, dy) in inches per frame, and the
+    simulation is fast-forwarded until every puck is at rest and the turn
+    has been handed over. Nothing is rendered and nothing waits on a clock.
+
+    Observation (flat list of floats):
+        per puck (8): x_in, y_in, owner (0 = P1, 1 = P2), in play (0/1)
+        then: throws_left P1, throws_left P2, current turn (0/1),
+              P1 score, P2 score, P1 round points, P2 round points
+    Reward: change in (own total + round points) minus the opponent's,
+    from the thrower's point of view.
+    """
+    NUM_PUCKS = 8
+
+    def __init__(self, board_length_ft=DEFAULT_LENGTH_FT, puck_size=DEFAULT_PUCK_SIZE,
+                 target_score=21, edging_enabled=True, max_throws=None, engine=ENGINE_SUBSTEP):
+        self.sim = ShuffleboardSim(board_length_ft, puck_size, target_score, edging_enabled, engine=engine)
+        self.max_throws = max_throws
+        self.throw_count = 0
+
+    def reset(self, seed=None, options=None):
+        if seed is not None:
+            self.sim.reseed(seed)
+        self.sim.reset_game()
+        self.throw_count = 0
+        return self._observe(), self._info(0)
+
+    def step(self, action):
+        sim = self.sim
+        x_in, y_in, dx, dy = action
+        player = sim.current_turn
+        before = self._advantage(player)
+
+        puck = sim.next_puck(player)
+        if puck is None:
+            raise RuntimeError(f"{player} has no puck left to throw")
+
+        # Releases must come from the throwing area, like the mouse input
+        r = puck.radius_in
+        x_in = max(r, min(x_in, THROW_LINE_FT * 12))
+        y_in = max(r, min(y_in, REAL_BOARD_WIDTH - r))
+
+        speed = math.hypot(dx, dy)
+        if speed > MAX_POWER:
+            scale = MAX_POWER / speed
+            dx *= scale
+            dy *= scale
+
+        puck.set_pos(x_in, y_in)
+        sim.throw(puck, dx, dy)
+        frames = sim.run_until_rest()
+        self.throw_count += 1
+
+        reward = self._advantage(player) - before
+        terminated = sim.game_over
+        truncated = bool(self.max_throws and self.throw_count >= self.max_throws and not terminated)
+        return self._observe(), reward, terminated, truncated, self._info(frames)
+
+    def _advantage(self, player):
+        s = self.sim.scores
+        p1 = s.p1_score + s.round_points[P1]
+        p2 = s.p2_score + s.round_points[P2]
+        return p1 - p2 if player == P1 else p2 - p1
+
+    def _observe(self):
+        sim = self.sim
+        obs = []
+        for i in range(self.NUM_PUCKS):
+            if i < len(sim.pucks):
+                p = sim.pucks[i]
+                in_play = 1.0 if p.state in (STATE_ON_BOARD, STATE_THROWN) else 0.0
+                obs.extend((p.x_in, p.y_in, 0.0 if p.owner == P1 else 1.0, in_play))
+            else:
+                obs.extend((0.0, 0.0, 0.0, 0.0))
+
+        s = sim.scores
+        obs.extend((
+            sim.throws_left[P1], sim.throws_left[P2],
+            0.0 if sim.current_turn == P1 else 1.0,
+            s.p1_score, s.p2_score,
+            s.round_points[P1], s.round_points[P2]
+        ))
+        return [float(v) for v in obs]
+
+    def _info(self, frames):
+        sim = self.sim
+        return {
+            "frames": frames,
+            "current_turn": sim.current_turn,
+            "throws_left": dict(sim.throws_left),
+            "round_points": dict(sim.scores.round_points),
+            "game_winner": sim.scores.game_winner
+        }
@@ -1,23 +1,24 @@
 import pygame
-import time
 import sys
 import os
 
 from . import constants
 from . import memory
-from . import physics
 from .input import InputHandler
+from .sim import ShuffleboardSim
+from .replay import ReplayRecorder
+from .profiler import FrameProfiler, PHASES, clock
 
 from .components.options import Options
 from .components.scoreboard import Scoreboard
 from .components.board import Table, Gutter
-from .components.puck import Puck 
+from .components.puck import Puck, clear_sprites, set_render_alpha
+from .components import fonts
 
-from .constants import REAL_BOARD_WIDTH, FPS, WOOD_DARK, BLACK, \
-                       FOUL_LINE_FT, DEFAULT_LENGTH_FT, DEFAULT_PUCK_SIZE, \
-                       TABLE_FRICTION, GUTTER_FRICTION, THROW_LINE_FT, \
-                       STATE_GUTTER, STATE_THROWN, STATE_ON_BOARD, STATE_SELECTED, STATE_READY, \
-                       P1, P2, PUCK_COLORS, SCORE_GAP_IN
+from .constants import RENDER_FPS_CAP, PHYSICS_HZ, MAX_CATCH_UP_TICKS, WOOD_DARK, BLACK, \
+                       DEFAULT_LENGTH_FT, DEFAULT_PUCK_SIZE, \
+                       STATE_THROWN, STATE_ON_BOARD, STATE_SELECTED, STATE_READY, \
+                       P1, PUCK_COLORS, SCOREBOARD_W_IN
 
 def resource_path(relative_path):
     try:
@@ -28,6 +29,9 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 def force_update_ppi(new_ppi):
+    if new_ppi != constants.PPI:
+        fonts.clear()
+        clear_sprites()
     constants.PPI = new_ppi
     constants.GUTTER_PADDING_LEFT = int(constants.GUTTER_LEFT_IN * new_ppi)
     constants.GUTTER_PADDING_RIGHT = int(constants.GUTTER_RIGHT_IN * new_ppi)
@@ -35,7 +39,23 @@ def force_update_ppi(new_ppi):
     constants.ICON_SIZE_PX = int(constants.ICON_SIZE_IN * new_ppi)
 
 class Shuffleboard:
-    def __init__(self):
+    # Gameplay state lives on the headless simulation; the window only reads and draws it
+    board_length_ft = property(lambda self: self.sim.board_length_ft,
+                               lambda self, v: setattr(self.sim, "board_length_ft", v))
+    puck_size = property(lambda self: self.sim.puck_size,
+                         lambda self, v: setattr(self.sim, "puck_size", v))
+    throws_left = property(lambda self: self.sim.throws_left,
+                           lambda self, v: setattr(self.sim, "throws_left", v))
+    current_turn = property(lambda self: self.sim.current_turn,
+                            lambda self, v: setattr(self.sim, "current_turn", v))
+    round_winner = property(lambda self: self.sim.round_winner,
+                            lambda self, v: setattr(self.sim, "round_winner", v))
+    game_over = property(lambda self: self.sim.game_over,
+                         lambda self, v: setattr(self.sim, "game_over", v))
+    game_state = property(lambda self: self.sim.game_state,
+                          lambda self, v: setattr(self.sim, "game_state", v))
+
+    def __init__(self, record=True, profile_csv=None, snapshot=None):
         pygame.init()
         pygame.display.set_caption("Shuffleboard")
 
@@ -47,94 +67,94 @@ class Shuffleboard:
             pass
 
         self.clock = pygame.time.Clock()
-        
-        self.board_length_ft = DEFAULT_LENGTH_FT
-        self.puck_size = DEFAULT_PUCK_SIZE
-        
-        saved_data = memory.load_memory()
-        valid_save = bool(saved_data and "gameplay" in saved_data and "settings" in saved_data)
 
-        self.menu = Options(self.board_length_ft, self.puck_size) 
+        # Static wood/table layer, re-rendered only when the layout changes
+        self.background = None
+        self.background_key = None
+        # Screen areas that changed this frame, and what each puck covered last frame
+        self.dirty_rects = []
+        self.last_puck_rects = {}
+        self.full_present = True
+
         self.scoreboard = Scoreboard()
-        self.gutter = Gutter(self.puck_size)
+        self.sim = ShuffleboardSim(DEFAULT_LENGTH_FT, DEFAULT_PUCK_SIZE, scores=self.scoreboard,
+                                   puck_factory=self._make_puck, round_delay_frames=2 * PHYSICS_HZ)
+        self.sim.on_turn_end = lambda: memory.save_memory(self)
+        self.sim.on_game_over = lambda: memory.save_memory(self)
+        self.sim.on_new_round = self._on_new_round
+        # Throws go to a replay log; it is started once the game is set up
+        self.recorder = ReplayRecorder() if record else None
+
+        # Frame phase timings: F3 shows them, profile_csv streams them to a file
+        self.profiler = FrameProfiler()
+        self.show_profiler = False
+        self.profiler_surf = None
+        if profile_csv:
+            self.profiler.start_csv(profile_csv)
+        self._update_profiling()
+        
+        self.menu = Options(self.board_length_ft, self.puck_size) 
+        self.gutter = Gutter(self.puck_size, self.sim.world)
+        self.gutter.pucks = self.sim.pucks
         self.input = InputHandler()
 
-        if valid_save:
-            s = saved_data.get("settings", {})
-            self.board_length_ft = s.get("length", DEFAULT_LENGTH_FT)
-            self.puck_size = s.get("puck_size", DEFAULT_PUCK_SIZE)
-            
-            saved_w = s.get("window_width", (40 + 12 * self.board_length_ft) * constants.PPI)
-            saved_h = s.get("window_height", 28 * constants.PPI)
+        # A snapshot file (e.g. a training checkpoint) wins over the autosave;
+        # either way the sim is restored first and the window follows it
+        view = None
+        if snapshot:
+            with open(snapshot, 'rb') as f:
+                view = memory.restore_snapshot(self.sim, f.read()) or {}
+        else:
+            saved_data = memory.load_memory()
+            if saved_data and "gameplay" in saved_data and "settings" in saved_data:
+                state, view = memory.state_from_memory(saved_data, self.sim.round_delay_frames)
+                self.sim.restore(state)
+
+        if view is not None:
+            saved_w = view.get("window_width", (40 + 12 * self.board_length_ft) * constants.PPI)
+            saved_h = view.get("window_height", 28 * constants.PPI)
             self.screen = pygame.display.set_mode((saved_w, saved_h), pygame.RESIZABLE)
             
             # Now safe to call: menu, scoreboard, and gutter all exist
             self.update_dimensions(saved_w, saved_h)
             
-            self.table = Table(self.screen_w, self.screen_h, self.surface_rect, self.board_length_ft)
-            self.scoreboard = Scoreboard()
-            self.scoreboard.reset()
-            self.gutter = Gutter(self.puck_size)
-            self.input = InputHandler()
-
-            self.menu.target_score = s.get("target_score", 21)
-            self.menu.edging_enabled = s.get("edging", True)
-            self.menu.p1_color = s.get("p1_color_name", "Red")
-            self.menu.p2_color = s.get("p2_color_name", "Blue")
-            self.menu.refresh_puck_positions() 
+            self.table = Table(self.screen_w, self.screen_h, self.surface_rect, self.sim.world)
+            self.gutter.puck_size = self.puck_size
 
-            g = saved_data.get("gameplay", {})
-            self.current_turn = g.get("current_turn", P1)
-            self.round_winner = g.get("round_winner", P1)
-            self.throws_left = {
-                P1: g.get("throws_left_p1", 4), 
-                P2: g.get("throws_left_p2", 4)
-            }
-            self.game_over = g.get("game_over", False)
-            self.game_state = g.get("game_state", "AIMING")
+            self.menu.target_score = self.sim.target_score
+            self.menu.edging_enabled = self.sim.edging_enabled
+            self.menu.p1_color = view.get("p1_color_name", "Red")
+            self.menu.p2_color = view.get("p2_color_name", "Blue")
+            self.menu.refresh_puck_positions() 
+            self._update_all_pucks_visuals()
             self.state = "GAME"
-            
-            if g.get("state_timer_active", False):
-                self.state_timer = time.time()
-            else:
-                self.state_timer = 0
-
-            sc = saved_data.get("scores", {})
-            self.scoreboard.p1_score = sc.get("p1_score", 0)
-            self.scoreboard.p2_score = sc.get("p2_score", 0)
-            self.scoreboard.round_points = {
-                P1: sc.get("round_p1", 0), 
-                P2: sc.get("round_p2", 0)
-            }
-            self.scoreboard.game_winner = sc.get("game_winner", None)
-
-            self.gutter.pucks = []
-            for p_data in saved_data.get("pucks", []):
-                col = tuple(p_data.get("color", PUCK_COLORS["Red"]))
-                owner = p_data.get("owner", P1)
-                new_puck = Puck(owner, self.puck_size, col, 
-                                font="couriernew", text_color=BLACK)
-                new_puck.x_in = p_data.get("x_in", 0)
-                new_puck.y_in = p_data.get("y_in", 0)
-                new_puck.state = p_data.get("state", STATE_GUTTER)
-                
-                new_puck.dx = p_data.get("dx", 0)
-                new_puck.dy = p_data.get("dy", 0)
-                new_puck.is_moving = p_data.get("is_moving", False)
-                
-                self.gutter.add_puck(new_puck)
 
         else:
             self.screen = pygame.display.set_mode(((40 + 12 * self.board_length_ft) * constants.PPI, 
                                                    28 * constants.PPI), 
                                                    pygame.RESIZABLE)
             self.update_dimensions()
-            self.table = Table(self.screen_w, self.screen_h, self.surface_rect, self.board_length_ft)
+            self.table = Table(self.screen_w, self.screen_h, self.surface_rect, self.sim.world)
+            self._sync_settings()
             self.round_winner = P1
-            self.throws_left = {P1: 4, P2: 4}
-            self.game_over = False
             self.start_new_round()
 
+        self.start_recording()
+
+    def _make_puck(self, owner):
+        color = PUCK_COLORS[self.menu.p1_color] if owner == P1 else PUCK_COLORS[self.menu.p2_color]
+        return Puck(owner, self.puck_size, color, font="couriernew", text_color=BLACK)
+
+    def _sync_settings(self):
+        """Pushes menu-only settings into the simulation."""
+        self.sim.target_score = self.menu.target_score
+        self.sim.edging_enabled = self.menu.edging_enabled
+        self.sim.mark_dirty()
+
+    def _on_new_round(self):
+        self.state = "GAME"
+        self.input.reset()
+
     def update_dimensions(self, new_w=None, new_h=None):
         if new_w and new_h:
             self.screen_w, self.screen_h = new_w, new_h
@@ -143,7 +163,7 @@ class Shuffleboard:
 
         # Internal layout units in inches
         board_in_w = self.board_length_ft * 12
-        scoreboard_in_w = 21.0      
+        scoreboard_in_w = SCOREBOARD_W_IN
         
         # Combined unit width: Gutter + Table + Gap + Scoreboard + Gutter
         total_content_in_w = (constants.GUTTER_LEFT_IN + board_in_w + 
@@ -174,10 +194,11 @@ class Shuffleboard:
             self.board_length_px, 
             constants.REAL_BOARD_WIDTH * new_ppi
         )
-        
+
+
         # Now call the method to update the UI icons and Table
         self._update_ui_elements()
-        self.table = Table(self.screen_w, self.screen_h, self.surface_rect, self.board_length_ft)
+        self.table = Table(self.screen_w, self.screen_h, self.surface_rect, self.sim.world)
         self._update_all_pucks_visuals()
 
     def _update_ui_elements(self):
@@ -222,48 +243,55 @@ class Shuffleboard:
             return fallback
 
     def start_new_round(self):
-        self.state = "GAME" 
-        self.game_state = "AIMING"
-        self.throws_left = {P1: 4, P2: 4}
-        self.game_over = False
-        
-        self.gutter.pucks = []
-        first = self.round_winner
-        second = P2 if first == P1 else P1
-        c1 = PUCK_COLORS[self.menu.p1_color]
-        c2 = PUCK_COLORS[self.menu.p2_color]
-        
-        for _ in range(4):
-            p_sec = Puck(second, self.puck_size, c2 if second == P2 else c1, 
-                         font="couriernew", text_color=BLACK)
-            p_fir = Puck(first, self.puck_size, c1 if first == P1 else c2, 
-                         font="couriernew", text_color=BLACK)
-            self.gutter.add_puck(p_sec)
-            self.gutter.add_puck(p_fir)
-            
-        self.gutter.scatter_pucks(self.screen_w, self.screen_h, self.board_length_ft)
-        self.current_turn = self.round_winner
-        self.state_timer = 0
-        self.input.reset()
+        self.sim.start_new_round()
 
     def run(self):
         running = True
+        tick = 1.0 / PHYSICS_HZ
+        lag = 0.0
+        last = clock()
+        self._remember_positions()
         while running:
+            # Only time anything while the profiler is on
+            prof = self.sim.profiler
+            if prof: t = clock()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT: 
                     running = False
-                    memory.save_memory(self) 
+                    memory.save_memory(self)
+                    memory.flush()
+                    if self.recorder: self.recorder.close()
+                    self.profiler.close()
                 self.handle_events(event)
-            self.update()
+            if prof: prof.lap("input", t)
+
+            # Physics ticks at its own fixed rate, whatever the frame rate:
+            # as many ticks as real time has passed, but after a long hitch
+            # at most MAX_CATCH_UP_TICKS, so a slow machine cannot fall
+            # further and further behind
+            now = clock()
+            lag = min(lag + now - last, MAX_CATCH_UP_TICKS * tick)
+            last = now
+            while lag >= tick:
+                self.update()
+                lag -= tick
+
+            if prof: t = clock()
+            set_render_alpha(lag / tick)
             self.draw()
-            pygame.display.flip()
-            self.clock.tick(FPS)
+            if prof: t = prof.lap("draw", t)
+            self.present()
+            if prof: t = prof.lap("flip", t)
+            self.clock.tick(RENDER_FPS_CAP)
+            if prof:
+                prof.lap("idle", t)
+                prof.end_frame()
         pygame.quit()
 
     def apply_hard_constraints(self, w, h):
         min_ppi = 7.0
         board_in_w = self.board_length_ft * 12
-        scoreboard_in_w = 21.0
+        scoreboard_in_w = SCOREBOARD_W_IN
         gap_in = constants.SCORE_GAP_IN
         
         total_in_w = (constants.GUTTER_LEFT_IN + board_in_w + 
@@ -280,6 +308,10 @@ class Shuffleboard:
         return w, h
 
     def handle_events(self, event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.toggle_profiler()
+            return
+
         if event.type == pygame.VIDEORESIZE:
             # 1. Enforce the 7 PPI limit immediately
             new_w, new_h = self.apply_hard_constraints(event.w, event.h)
@@ -288,7 +320,7 @@ class Shuffleboard:
             self.update_dimensions(new_w, new_h)
             
             # 3. Refresh the table object
-            self.table = Table(self.screen_w, self.screen_h, self.surface_rect, self.board_length_ft)
+            self.table = Table(self.screen_w, self.screen_h, self.surface_rect, self.sim.world)
             
             # 4. If in Menu, update its unique layout
             if self.state == "MENU":
@@ -306,17 +338,18 @@ class Shuffleboard:
                 force_update_ppi(self.menu.ppi)
                 self.update_dimensions()
                 self.menu.update_layout(self.screen_w, self.screen_h) 
-                self.table = Table(self.screen_w, self.screen_h, self.surface_rect, self.board_length_ft)
+                self.table = Table(self.screen_w, self.screen_h, self.surface_rect, self.sim.world)
                 self._update_all_pucks_visuals()
 
             elif result == "SLIDER_UPDATE":
                 self.board_length_ft = int(self.menu.length)
                 self.update_dimensions()
                 self.menu.update_layout(self.screen_w, self.screen_h)
-                self.table = Table(self.screen_w, self.screen_h, self.surface_rect, self.board_length_ft)
+                self.table = Table(self.screen_w, self.screen_h, self.surface_rect, self.sim.world)
                 self._update_all_pucks_visuals()
 
             elif result == "START":
+                self._sync_settings()
                 memory.save_memory(self)
                 self.state = "GAME"
                 # UPDATED: Use new edging_enabled property name
@@ -328,9 +361,7 @@ class Shuffleboard:
                 if has_changed:
                     self.board_length_ft = int(self.menu.length)
                     self.puck_size = self.menu.puck_size
-                    self.scoreboard.reset()
-                    self.round_winner = P1
-                    self.start_new_round()
+                    self.reset_game()
                 else:
                     self._update_all_pucks_visuals()
 
@@ -366,212 +397,88 @@ class Shuffleboard:
             color = c1 if p.owner == P1 else c2
             p.update_visuals(self.puck_size, color)
 
+    def start_recording(self):
+        if self.recorder is None: return
+        try:
+            self.recorder.start(self.sim)
+        except OSError:
+            self.recorder = None
+
     def reset_game(self):
-        self.scoreboard.reset()
-        self.round_winner = P1
-        self.start_new_round()
+        self.sim.reset_game()
+        self.start_recording()
 
     def reset_non_scoring_pucks(self):
         if self.game_over:
-            for p in self.gutter.pucks:
-                p.state = STATE_GUTTER
-                p.dx = 0
-                p.dy = 0
-                p.is_moving = False
-                p.is_selected = False
             self.input.selected_puck = None
-            self.gutter.scatter_pucks(self.screen_w, self.screen_h, self.board_length_ft)
-        else:
-            active_pucks = []
-            reset_candidates = []
-            for p in self.gutter.pucks:
-                if p.state in (STATE_ON_BOARD, STATE_THROWN, STATE_SELECTED):
-                    active_pucks.append(p)
-                else:
-                    p.state = STATE_GUTTER
-                    p.dx = 0; p.dy = 0
-                    p.is_moving = False
-                    reset_candidates.append(p)
-            self.gutter.pucks = reset_candidates
-            self.gutter.scatter_pucks(self.screen_w, self.screen_h, self.board_length_ft)
-            self.gutter.pucks.extend(active_pucks)
+        self.sim.reset_non_scoring_pucks()
+        if self.recorder: self.recorder.reset_non_scoring(self.sim)
 
     def shoot_puck(self, puck, dx, dy, count_throw=True):
-        puck.dx = dx; puck.dy = dy
-        puck.is_moving = True
-        puck.is_selected = False
-        
         self.input.selected_puck = None
-        
-        if count_throw:
-            puck.state = STATE_THROWN
-            if not self.game_over:
-                if self.throws_left[puck.owner] > 0: self.throws_left[puck.owner] -= 1
-            self.game_state = "MOVING"
-        else:
-            if self.table.is_touching_table(puck):
-                puck.state = STATE_THROWN
-            else:
-                puck.state = STATE_GUTTER 
+        if self.recorder: self.recorder.throw(self.sim, puck, dx, dy, count_throw)
+        self.sim.throw(puck, dx, dy, count_throw)
+
+    def drop_puck(self, puck):
+        """Records a held puck being put back down without a throw."""
+        if self.recorder: self.recorder.drop(self.sim, puck)
+
+    def drag_puck(self, puck, table_pucks):
+        """Resolves a dragged puck against the rest; table pucks it shoves are recorded."""
+        before = [(p, p.x_in, p.y_in, p.dx, p.dy) for p in table_pucks] if self.recorder else ()
+        self.gutter.update_constraints(puck, table_pucks)
+        shoved = [p for (p, x, y, dx, dy) in before if (p.x_in, p.y_in, p.dx, p.dy) != (x, y, dx, dy)]
+        if shoved: self.recorder.nudge(self.sim, shoved)
+
+    def start_free_play(self):
+        """
+        Free play after the game is over is not recorded: a held puck also
+        shoves table pucks during physics ticks, which a replay cannot redo.
+        """
+        if self.recorder: self.recorder.close()
+
+    def toggle_profiler(self):
+        self.show_profiler = not self.show_profiler
+        self.profiler.reset()
+        self.profiler_surf = None
+        self.full_present = True
+        self._update_profiling()
+
+    def _update_profiling(self):
+        """Hands the profiler to the sim only while someone is looking at the numbers."""
+        self.profiler.enabled = self.show_profiler or self.profiler.streaming
+        self.sim.profiler = self.profiler if self.profiler.enabled else None
+
+    def _remember_positions(self):
+        for p in self.gutter.pucks: p.remember_pos()
+        for p in self.menu.menu_pucks: p.remember_pos()
 
     def update(self):
+        """One physics tick."""
         if self.state == "GAME":
             self.gutter.free_play = self.game_over
+            prof = self.sim.profiler
+            if prof: t = clock()
             self.input.update_hover(self)
-            
-            # --- PRE-CALCULATIONS ---
-            current_ppi = constants.PPI 
-            g_left_px = constants.GUTTER_PADDING_LEFT
-            g_y_px = constants.GUTTER_PADDING_Y
-            
-            b_min_x = -g_left_px / current_ppi
-            b_max_x = (self.screen_w - g_left_px) / current_ppi
-            b_min_y = -g_y_px / current_ppi
-            b_max_y = (self.screen_h - g_y_px) / current_ppi
-
-            board_len_in = (self.screen_w - g_left_px - constants.GUTTER_PADDING_RIGHT) / current_ppi
-            throw_line_in = THROW_LINE_FT * 12
-            
-            all_pucks = self.gutter.pucks
-            
-            # --- SUB-STEPPING LOOP (The Fix for Tunneling) ---
-            # We break the frame into 8 small movement steps.
-            # This ensures fast pucks can't "skip" over other pucks.
-            SUB_STEPS = 8 
-            
-            for _ in range(SUB_STEPS):
-                # 1. Move every puck a tiny amount
-                for puck in all_pucks:
-                    # Update State Checks (Keep your existing logic)
-                    if self.game_over:
-                        if puck.state == STATE_READY: puck.state = STATE_ON_BOARD
-                        if puck.state == STATE_THROWN and not puck.is_moving: puck.state = STATE_ON_BOARD
-
-                    physics.move_puck_substep(puck, SUB_STEPS)
-
-                    # 2. Bounce off walls immediately after moving a tiny bit
-                    if puck.is_moving:
-                        physics.resolve_boundary_bounce(puck, b_min_x, b_max_x, b_min_y, b_max_y)
-
-                        if puck.state == STATE_GUTTER:
-                            self.gutter.resolve_rect_obstacle(puck, 0, board_len_in, 0, REAL_BOARD_WIDTH)
-                        elif puck.state in (STATE_READY, STATE_SELECTED):
-                             if not self.game_over:
-                                self.gutter.resolve_rect_obstacle(puck, throw_line_in, board_len_in, 0, REAL_BOARD_WIDTH)
-                
-                # 3. Check Collisions immediately after the tiny move
-                for i in range(len(all_pucks)):
-                    p1 = all_pucks[i]
-                    for j in range(i+1, len(all_pucks)):
-                        p2 = all_pucks[j]
-                        
-                        should_collide = False
-                        if p1.state == STATE_GUTTER and p2.state == STATE_GUTTER:
-                            should_collide = True
-                        elif self.game_over:
-                            if p1.state != STATE_GUTTER and p2.state != STATE_GUTTER:
-                                should_collide = True
-                        else:
-                            valid_states = [STATE_THROWN, STATE_ON_BOARD, STATE_READY, STATE_SELECTED]
-                            if p1.state in valid_states and p2.state in valid_states:
-                                 if p1.state == STATE_SELECTED and p2.state == STATE_ON_BOARD: pass
-                                 elif p2.state == STATE_SELECTED and p1.state == STATE_ON_BOARD: pass
-                                 else: should_collide = True
-                        
-                        if should_collide:
-                            physics.check_puck_collision(p1, p2)
-
-            # --- END OF FRAME: Apply Friction & Cleanup ---
-            moving_count = 0
-            for puck in all_pucks:
-                # Stability Check
-                if puck.state in [STATE_THROWN, STATE_ON_BOARD, STATE_READY]:
-                    if not self.table.is_puck_stable(puck): puck.state = STATE_GUTTER
-                
-                # Friction Application (Once per frame!)
-                if puck.is_moving:
-                    if self.game_over:
-                        on_wood = self.table.is_touching_table(puck)
-                        fric = TABLE_FRICTION if on_wood else GUTTER_FRICTION
-                    else:
-                        fric = TABLE_FRICTION if (puck.state in [STATE_THROWN, STATE_ON_BOARD, STATE_READY]) else GUTTER_FRICTION
-                    
-                    # Apply the friction now that movement is done
-                    physics.apply_friction(puck, fric)
-                    
-                    if puck.state in (STATE_THROWN, STATE_ON_BOARD): moving_count += 1
-                
-                # Gutter Resolve (Safety check at end of frame)
-                if puck.state == STATE_GUTTER:
-                    self.gutter.resolve_rect_obstacle(puck, 0, board_len_in, 0, REAL_BOARD_WIDTH)
-
-            # --- SCREEN CLAMPING (Keep your existing clamping) ---
-            for puck in self.gutter.pucks:
-                min_x = -constants.GUTTER_PADDING_LEFT / constants.PPI
-                max_x = (self.screen_w - constants.GUTTER_PADDING_LEFT) / constants.PPI
-                min_y = -constants.GUTTER_PADDING_Y / constants.PPI
-                max_y = (self.screen_h - constants.GUTTER_PADDING_Y) / constants.PPI
-
-                if puck.x_in < min_x + puck.radius_in:
-                    puck.x_in = min_x + puck.radius_in; puck.dx = 0
-                elif puck.x_in > max_x - puck.radius_in:
-                    puck.x_in = max_x - puck.radius_in; puck.dx = 0
-
-                if puck.y_in < min_y + puck.radius_in:
-                    puck.y_in = min_y + puck.radius_in; puck.dy = 0
-                elif puck.y_in > max_y - puck.radius_in:
-                    puck.y_in = max_y - puck.radius_in; puck.dy = 0
-
-            # --- SCORING & TURN LOGIC ---
-            scoring_candidates = [p for p in all_pucks if self.table.is_touching_table(p)]
-            self.scoreboard.calculate_points(scoring_candidates, self.board_length_ft, self.menu.edging_enabled, self.game_over)
-
-            if self.game_state == "MOVING" and moving_count == 0: self.handle_turn_end()
-            if self.game_state == "ROUND_OVER_DELAY":
-                if self.game_over or (time.time() - self.state_timer > 2.0):
-                    winner, is_game_over = self.scoreboard.commit_round(self.menu.target_score)
-                    if is_game_over:
-                        self.game_over = True; self.round_winner = winner; self.game_state = "AIMING"
-                        memory.save_memory(self)
-                    else:
-                        self.round_winner = winner if winner else (P2 if self.round_winner == P1 else P1)
-                        self.start_new_round()
+            if prof: prof.lap("input", t)
+            for p in self.gutter.pucks: p.remember_pos()
+            self.sim.step()
+        elif self.state == "MENU":
+            for p in self.menu.menu_pucks: p.remember_pos()
+            self.menu.update_physics()
 
     def handle_turn_end(self):
-        f_line = (self.board_length_ft - FOUL_LINE_FT) * 12
-        
-        for p in self.gutter.pucks:
-            if p.state in (STATE_THROWN, STATE_ON_BOARD, STATE_READY):
-                if self.game_over:
-                    p.state = STATE_ON_BOARD
-                else:
-                    has_crossed = (p.x_in - p.radius_in) > f_line
-                    
-                    if has_crossed:
-                        p.state = STATE_ON_BOARD
-                    else:
-                        p.state = STATE_GUTTER
-                        self.gutter.place_puck_nearest(p, self.screen_h, self.screen_w)
-
-        if self.throws_left[P1] == 0 and self.throws_left[P2] == 0:
-            self.game_state = "ROUND_OVER_DELAY"
-            self.state_timer = time.time()
-        else:
-            if not self.game_over:
-                next_turn = P2 if self.current_turn == P1 else P1
-                if self.throws_left[next_turn] > 0: self.current_turn = next_turn
-            self.game_state = "AIMING"
-        
-        memory.save_memory(self)
+        self.sim.handle_turn_end()
 
     def draw(self):
         if self.state == "MENU":
             self.menu.draw(self.screen)
+            if self.show_profiler: self.draw_profiler()
         else:
-            self.screen.fill(WOOD_DARK)
+            self.screen.blit(self.get_background(), (0, 0))
             c1, c2 = PUCK_COLORS[self.menu.p1_color], PUCK_COLORS[self.menu.p2_color]
             
-            self.scoreboard.draw(
+            score_rect = self.scoreboard.draw(
                 self.screen, self.screen_w, self.screen_h, 
                 self.throws_left, self.current_turn, c1, c2, 
                 self.game_state == "MOVING", self.game_over,
@@ -579,13 +486,6 @@ class Shuffleboard:
             )
 
             self.gutter.draw_gutter_layer(self.screen)
-
-            shadow_offset = 4 
-            shadow_surface = pygame.Surface((self.surface_rect.width, self.surface_rect.height), pygame.SRCALPHA)
-            shadow_surface.fill((0, 0, 0, 60)) 
-            self.screen.blit(shadow_surface, (self.surface_rect.x + shadow_offset, self.surface_rect.y + shadow_offset))
-
-            self.table.draw(self.screen)
             
             self.gutter.draw_puck_shadows(self.screen, self.surface_rect, [STATE_SELECTED, STATE_READY, STATE_THROWN])
             self.gutter.draw_active_layer(self.screen)
@@ -602,4 +502,76 @@ class Shuffleboard:
             self.screen.blit(self.icons[k_r], self.reset_btn_rect)
             
             k_p = 'puck_white' if self.puck_btn_rect.collidepoint(m_pos) else 'puck_grey'
-            self.screen.blit(self.icons[k_p], self.puck_btn_rect)
\ No newline at end of file
+            self.screen.blit(self.icons[k_p], self.puck_btn_rect)
+
+            self.dirty_rects = self.collect_dirty_rects()
+            self.dirty_rects.extend((score_rect, self.icon_rect, self.reset_btn_rect, self.puck_btn_rect))
+            if self.show_profiler: self.dirty_rects.append(self.draw_profiler())
+
+    def draw_profiler(self):
+        """Overlay of rolling mean / p99 per phase (ms), redrawn a few times a second."""
+        prof = self.profiler
+        if self.profiler_surf is None or prof.frame % 15 == 0:
+            font = fonts.get_font("couriernew", 14, bold=True)
+            rows = [f"{'phase':<11}{'mean':>7}{'p99':>7}"]
+            for phase in PHASES:
+                mean, p99 = prof.stats(phase)
+                rows.append(f"{phase:<11}{mean:>7.2f}{p99:>7.2f}")
+            mean, p99 = prof.stats()
+            rows.append(f"{'frame':<11}{mean:>7.2f}{p99:>7.2f}")
+
+            line_h = font.get_linesize()
+            width = max(font.size(row)[0] for row in rows) + 12
+            surf = pygame.Surface((width, line_h * len(rows) + 8), pygame.SRCALPHA)
+            surf.fill((0, 0, 0, 170))
+            for i, row in enumerate(rows):
+                surf.blit(font.render(row, True, constants.WHITE), (6, 4 + i * line_h))
+            self.profiler_surf = surf
+        rect = self.profiler_surf.get_rect(topleft=(8, 8))
+        self.screen.blit(self.profiler_surf, rect)
+        return rect
+
+    def get_background(self):
+        """Wood, table shadow and table markings, rendered once per layout."""
+        key = (self.table, self.screen_w, self.screen_h, tuple(self.surface_rect))
+        if self.background is None or self.background_key != key:
+            bg = pygame.Surface((self.screen_w, self.screen_h))
+            bg.fill(WOOD_DARK)
+
+            shadow_offset = 4
+            shadow_surface = pygame.Surface((self.surface_rect.width, self.surface_rect.height), pygame.SRCALPHA)
+            shadow_surface.fill((0, 0, 0, 60))
+            bg.blit(shadow_surface, (self.surface_rect.x + shadow_offset, self.surface_rect.y + shadow_offset))
+
+            self.table.draw(bg)
+            self.background = bg.convert() if pygame.display.get_surface() else bg
+            self.background_key = key
+            self.full_present = True
+        return self.background
+
+    def collect_dirty_rects(self):
+        """Old and new screen areas of every puck that moved or changed look since the last frame."""
+        rects = []
+        current = {}
+        for p in self.gutter.pucks:
+            pos = p.get_screen_pos()
+            reach = p.radius_px + 5 # highlight ring + shadow offset
+            rect = pygame.Rect(int(pos.x) - reach, int(pos.y) - reach, reach * 2, reach * 2)
+            look = (rect, p.color, p.highlighted, p.state)
+            current[p] = look
+            if self.last_puck_rects.get(p) != look:
+                rects.append(rect)
+                if p in self.last_puck_rects: rects.append(self.last_puck_rects[p][0])
+
+        for p, look in self.last_puck_rects.items():
+            if p not in current: rects.append(look[0])
+        self.last_puck_rects = current
+        return rects
+
+    def present(self):
+        """Pushes the frame to the window: all of it after a layout change, otherwise only what changed."""
+        if self.state == "MENU" or self.full_present:
+            pygame.display.flip()
+            self.full_present = self.state == "MENU"
+        elif self.dirty_rects:
+            pygame.display.update(self.dirty_rects)
\ No newline at end of file
@@ -54,6 +54,8 @@ class InputHandler:
                             
                             self.throw_history = []
                             game.gutter.pucks.append(game.gutter.pucks.pop(i))
+                            if game.game_over:
+                                game.start_free_play()
                             break
 
         elif event.type == pygame.MOUSEBUTTONUP:
@@ -99,12 +101,7 @@ class InputHandler:
                     and p.state in (STATE_ON_BOARD, STATE_THROWN, STATE_READY)
                 ]
 
-                game.gutter.update_constraints(
-                    self.selected_puck, 
-                    game.screen_w, 
-                    game.screen_h,
-                    active_obstacles
-                )
+                game.drag_puck(self.selected_puck, active_obstacles)
 
                 self.throw_history.append(m_pos)
                 if len(self.throw_history) > 3:
@@ -140,6 +137,7 @@ class InputHandler:
                 self.selected_puck.state = STATE_READY
         else:
             self.selected_puck.state = STATE_GUTTER
+        game.drop_puck(self.selected_puck)
             
         self.selected_puck = None
         self.throw_history = []
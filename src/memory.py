@@ -1,7 +1,43 @@
+import ast
 import json
 import os
 import sys
+import time
+import struct
+import atexit
+import threading
 from . import constants
+from .sim import GameState
+
+# Saves arriving within this window of the first one are written once
+SAVE_DEBOUNCE_S = 0.25
+
+# --- BINARY SNAPSHOTS ---
+# A sim's GameState (sim.capture()) packed into fixed-layout records, so
+# headless sims can be checkpointed as well as the game:
+#   header   magic, version
+#   game     settings, frame, round, turn state, scores, puck count
+#   seed     the game seed as a Python literal (length-prefixed UTF-8), so
+#            any seed reseed() takes survives, not just unsigned 64-bit ones
+#   pucks    owner, state, is_moving, sleeping, x, y, dx, dy
+#   rng      flag, then the Mersenne Twister words and gauss_next if set
+#   view     flag, then ppi, window w/h and the two color names
+#            (length-prefixed UTF-8) if the snapshot came from the window
+SNAPSHOT_MAGIC = b"SHFB"
+SNAPSHOT_VERSION = 3
+
+_HEADER = struct.Struct("<4sB")
+_GAME = struct.Struct("<dd i? QI BBBB?Bi iiiiB H")
+_SEED_LEN = struct.Struct("<I")
+_PUCK = struct.Struct("<BB??dddd")
+_RNG = struct.Struct("<625I?d")
+_VIEW = struct.Struct("<dii")
+
+# Enum tables; codes are stored as the index (winner/owner 0 = none)
+_PLAYERS = (None, constants.P1, constants.P2)
+_PUCK_STATES = (constants.STATE_GUTTER, constants.STATE_READY, constants.STATE_SELECTED,
+                constants.STATE_THROWN, constants.STATE_ON_BOARD)
+_GAME_STATES = ("AIMING", "MOVING", "ROUND_OVER_DELAY")
 
 def get_data_path():
     """
@@ -20,6 +56,15 @@ def get_data_path():
     return os.path.join(path, "memory.json")
 
 def save_memory(game):
+    """Queues an autosave; the file is written on a background thread."""
+    _saver.request(snapshot_game(game))
+
+def flush():
+    """Writes any queued save now and waits for it (call before exiting)."""
+    _saver.flush()
+
+def snapshot_game(game):
+    """Plain-data copy of everything that gets saved, cheap enough for the game thread."""
     data = {
         "settings": {
             "length": game.board_length_ft,
@@ -46,7 +91,7 @@ def save_memory(game):
             "throws_left_p2": game.throws_left[constants.P2],
             "game_over": game.game_over,
             "game_state": game.game_state,
-            "state_timer_active": (game.state_timer != 0)
+            "state_timer_active": (game.game_state == "ROUND_OVER_DELAY")
         },
         "pucks": []
     }
@@ -63,13 +108,269 @@ def save_memory(game):
             "color": p.color
         }
         data["pucks"].append(p_data)
+    return data
 
+def write_memory(data, path=None):
+    """
+    Writes save data atomically: a temp file next to the save is fully
+    written and synced, then renamed over it, so a crash mid-write leaves
+    the previous save intact.
+    """
+    path = path or get_data_path()
+    tmp_path = path + ".tmp"
     try:
-        with open(get_data_path(), 'w') as f:
+        with open(tmp_path, 'w') as f:
             json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
     except Exception as e:
         print(f"Failed to save game data: {e}")
 
+class AutoSaver:
+    """
+    Background writer for save data. Requests made in quick succession are
+    coalesced and only the newest one is written.
+    """
+    def __init__(self, delay=SAVE_DEBOUNCE_S):
+        self.delay = delay
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._pending = None
+        self._due = 0
+        self._seq = 0
+        self._written_seq = 0
+        self._thread = None
+
+    def request(self, data):
+        with self._cond:
+            self._seq += 1
+            if self._pending is None:
+                self._due = time.monotonic() + self.delay
+            self._pending = (self._seq, data)
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def flush(self):
+        """Writes the pending save now and returns only once every save requested so far is on disk."""
+        with self._cond:
+            target = self._seq
+            job = self._pending
+            self._pending = None
+        if job is not None:
+            self._write(job)
+        # The worker may have taken the newest save off _pending and still be writing it
+        with self._cond:
+            while self._written_seq < target:
+                self._cond.wait()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                while self._pending is not None and time.monotonic() < self._due:
+                    self._cond.wait(self._due - time.monotonic())
+                job = self._pending
+                self._pending = None
+            if job is not None:
+                self._write(job)
+
+    def _write(self, job):
+        seq, data = job
+        with self._write_lock:
+            try:
+                # A flush may already have written something newer
+                if seq > self._written_seq:
+                    write_memory(data)
+            finally:
+                with self._cond:
+                    self._written_seq = max(self._written_seq, seq)
+                    self._cond.notify_all()
+
+_saver = AutoSaver()
+atexit.register(flush)
+
+def snapshot_view(game):
+    """The window settings a snapshot of the game carries alongside its GameState."""
+    return {
+        "ppi": constants.PPI,
+        "window_width": game.screen_w,
+        "window_height": game.screen_h,
+        "p1_color_name": game.menu.p1_color,
+        "p2_color_name": game.menu.p2_color
+    }
+
+def _seed_literal(seed):
+    """
+    repr() of the seed if it reads back as the same value. Anything else is
+    stored as its str(), which seeds the RNG the same way (reseed formats it).
+    """
+    text = repr(seed)
+    try:
+        if ast.literal_eval(text) == seed: return text
+    except (ValueError, SyntaxError):
+        pass
+    return repr(str(seed))
+
+def encode_snapshot(state, seed, view=None):
+    """Packs a GameState (plus the game seed and optional window settings) into a binary snapshot."""
+    length, puck_size, target, edging = state.settings
+    p1_score, p2_score, round_p1, round_p2, winner = state.scores
+    parts = [
+        _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION),
+        _GAME.pack(length, puck_size, target, edging, state.frame, state.round_number,
+                   _PLAYERS.index(state.current_turn), _PLAYERS.index(state.round_winner),
+                   state.throws_left[0], state.throws_left[1], state.game_over,
+                   _GAME_STATES.index(state.game_state), state.round_delay_left,
+                   p1_score, p2_score, round_p1, round_p2, _PLAYERS.index(winner),
+                   len(state.pucks))
+    ]
+    seed_text = _seed_literal(seed).encode("utf-8")
+    parts += [_SEED_LEN.pack(len(seed_text)), seed_text]
+    pack_puck = _PUCK.pack
+    for owner, x, y, dx, dy, moving, puck_state, sleeping in state.pucks:
+        parts.append(pack_puck(_PLAYERS.index(owner), _PUCK_STATES.index(puck_state),
+                               moving, sleeping, x, y, dx, dy))
+
+    if state.rng_state is None:
+        parts.append(b"\x00")
+    else:
+        _, words, gauss_next = state.rng_state
+        parts.append(b"\x01" + _RNG.pack(*words, gauss_next is not None, gauss_next or 0.0))
+
+    if view is None:
+        parts.append(b"\x00")
+    else:
+        parts.append(b"\x01" + _VIEW.pack(view["ppi"], int(view["window_width"]), int(view["window_height"])))
+        for name in (view["p1_color_name"], view["p2_color_name"]):
+            name = name.encode("utf-8")
+            parts += [bytes((len(name),)), name]
+    return b"".join(parts)
+
+def decode_snapshot(buf):
+    """Unpacks a binary snapshot into (GameState, seed, view); view is None for headless sims."""
+    magic, version = _HEADER.unpack_from(buf, 0)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("Not a shuffleboard snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}")
+    pos = _HEADER.size
+
+    (length, puck_size, target, edging, frame, round_number,
+     turn, round_winner, t1, t2, game_over, game_state, delay_left,
+     p1_score, p2_score, round_p1, round_p2, winner, count) = _GAME.unpack_from(buf, pos)
+    pos += _GAME.size
+    (n,) = _SEED_LEN.unpack_from(buf, pos)
+    pos += _SEED_LEN.size
+    seed = ast.literal_eval(bytes(buf[pos:pos + n]).decode("utf-8"))
+    pos += n
+
+    state = GameState()
+    state.settings = (int(length) if length.is_integer() else length, puck_size, target, edging)
+    state.pucks = [(_PLAYERS[owner], x, y, dx, dy, moving, _PUCK_STATES[puck_state], sleeping)
+                   for owner, puck_state, moving, sleeping, x, y, dx, dy
+                   in _PUCK.iter_unpack(buf[pos:pos + count * _PUCK.size])]
+    pos += count * _PUCK.size
+    state.throws_left = (t1, t2)
+    state.current_turn = _PLAYERS[turn]
+    state.round_winner = _PLAYERS[round_winner]
+    state.game_over = game_over
+    state.game_state = _GAME_STATES[game_state]
+    state.round_delay_left = delay_left
+    state.frame = frame
+    state.round_number = round_number
+    state.scores = (p1_score, p2_score, round_p1, round_p2, _PLAYERS[winner])
+
+    state.rng_state = None
+    has_rng = buf[pos]
+    pos += 1
+    if has_rng:
+        *words, has_gauss, gauss_next = _RNG.unpack_from(buf, pos)
+        pos += _RNG.size
+        state.rng_state = (3, tuple(words), gauss_next if has_gauss else None)
+
+    view = None
+    has_view = buf[pos]
+    pos += 1
+    if has_view:
+        ppi, win_w, win_h = _VIEW.unpack_from(buf, pos)
+        pos += _VIEW.size
+        names = []
+        for _ in range(2):
+            n = buf[pos]
+            names.append(bytes(buf[pos + 1:pos + 1 + n]).decode("utf-8"))
+            pos += 1 + n
+        view = {"ppi": ppi, "window_width": win_w, "window_height": win_h,
+                "p1_color_name": names[0], "p2_color_name": names[1]}
+
+    return state, seed, view
+
+def restore_snapshot(sim, buf):
+    """Puts a sim into the position stored in a binary snapshot; returns the window settings, if any."""
+    state, seed, view = decode_snapshot(buf)
+    sim.restore(state)
+    if state.rng_state is None:
+        sim.reseed(seed)
+    else:
+        sim.seed = seed
+    return view
+
+def save_snapshot(source, path):
+    """Writes a binary snapshot of a sim, or of the game and its window settings, to `path` atomically."""
+    sim = getattr(source, "sim", source)
+    view = snapshot_view(source) if sim is not source else None
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(encode_snapshot(sim.capture(), sim.seed, view))
+    os.replace(tmp_path, path)
+
+def load_snapshot(path):
+    """(GameState, seed, view) from a snapshot file; see restore_snapshot to apply it."""
+    with open(path, 'rb') as f:
+        return decode_snapshot(f.read())
+
+def state_from_memory(data, round_delay_frames=0):
+    """
+    (GameState, view) from memory.json save data, so the game loads saves
+    and snapshots the same way. Missing fields fall back to a fresh game's.
+    """
+    s = data.get("settings", {})
+    g = data.get("gameplay", {})
+    sc = data.get("scores", {})
+    length = s.get("length", constants.DEFAULT_LENGTH_FT)
+
+    state = GameState()
+    state.settings = (length, s.get("puck_size", constants.DEFAULT_PUCK_SIZE),
+                      s.get("target_score", 21), s.get("edging", True))
+    state.pucks = [(p.get("owner", constants.P1), p.get("x_in", 0), p.get("y_in", 0),
+                    p.get("dx", 0), p.get("dy", 0), p.get("is_moving", False),
+                    p.get("state", constants.STATE_GUTTER), False)
+                   for p in data.get("pucks", [])]
+    state.throws_left = (g.get("throws_left_p1", 4), g.get("throws_left_p2", 4))
+    state.current_turn = g.get("current_turn", constants.P1)
+    state.round_winner = g.get("round_winner", constants.P1)
+    state.game_over = g.get("game_over", False)
+    state.game_state = g.get("game_state", "AIMING")
+    state.round_delay_left = round_delay_frames if g.get("state_timer_active", False) else 0
+    state.frame = 0
+    state.round_number = 0
+    state.scores = (sc.get("p1_score", 0), sc.get("p2_score", 0),
+                    sc.get("round_p1", 0), sc.get("round_p2", 0), sc.get("game_winner", None))
+    state.rng_state = None
+
+    view = {
+        "ppi": s.get("ppi", constants.PPI),
+        "window_width": s.get("window_width", (40 + 12 * length) * constants.PPI),
+        "window_height": s.get("window_height", 28 * constants.PPI),
+        "p1_color_name": s.get("p1_color_name", "Red"),
+        "p2_color_name": s.get("p2_color_name", "Blue")
+    }
+    return state, view
+
 def load_memory():
     path = get_data_path()
     if not os.path.exists(path):
@@ -1,6 +1,6 @@
 import math
 import random
-from .constants import MIN_SPEED, STATE_SELECTED, STATE_ON_BOARD, STATE_THROWN
+from .constants import MIN_SPEED, STATE_SELECTED, STATE_ON_BOARD, STATE_THROWN, REAL_BOARD_WIDTH
 
 def move_puck_substep(puck, steps):
     """
@@ -67,7 +67,7 @@ def resolve_rect_container(puck, min_x, max_x, min_y, max_y):
         puck.y_in = max_y - puck.radius_in
         puck.dy *= bounce
 
-def check_puck_collision(p1, p2):
+def check_puck_collision(p1, p2, rng=random):
     dx = p1.x_in - p2.x_in
     dy = p1.y_in - p2.y_in
     dist = math.hypot(dx, dy)
@@ -76,7 +76,7 @@ def check_puck_collision(p1, p2):
     if dist < min_dist:
         # 1. Improved Angle Calculation
         if dist == 0: 
-            angle = random.uniform(0, 2 * math.pi)
+            angle = rng.uniform(0, 2 * math.pi)
             dist = 0.001
         else:
             angle = math.atan2(dy, dx)
@@ -126,9 +126,11 @@ def check_puck_collision(p1, p2):
         p2.dx -= j * nx
         p2.dy -= j * ny
         
-        # Wake up both pucks
-        p1.is_moving = True
-        p2.is_moving = True
+        # Wake up both pucks (a zero-impulse touch inside the slop must not,
+        # or two resting pucks keep each other "moving" forever)
+        if correction > 0 or j != 0:
+            p1.is_moving = True
+            p2.is_moving = True
 
 def _apply_kick(puck, nx, ny, overlap, invert=False):
     direction = -1 if invert else 1
@@ -174,4 +176,259 @@ def resolve_static_push(pusher, pushed):
         else: angle = math.atan2(dy, dx)
         
         pushed.x_in += math.cos(angle) * overlap
-        pushed.y_in += math.sin(angle) * overlap
\ No newline at end of file
+        pushed.y_in += math.sin(angle) * overlap
+
+def resolve_rect_obstacle(puck, r_min_x, r_max_x, r_min_y, r_max_y):
+    """Pushes a puck out of a solid rectangle (e.g. the table seen from the gutter)."""
+    cx = max(r_min_x, min(puck.x_in, r_max_x))
+    cy = max(r_min_y, min(puck.y_in, r_max_y))
+
+    dx = puck.x_in - cx
+    dy = puck.y_in - cy
+    dist_sq = dx*dx + dy*dy
+    
+    if dist_sq < (puck.radius_in * puck.radius_in):
+        nx, ny = 0, 0
+        if dist_sq == 0:
+            d_left = abs(puck.x_in - r_min_x)
+            d_right = abs(puck.x_in - r_max_x)
+            d_top = abs(puck.y_in - r_min_y)
+            d_bottom = abs(puck.y_in - r_max_y)
+            m = min(d_left, d_right, d_top, d_bottom)
+            if m == d_left: 
+                puck.x_in = r_min_x - puck.radius_in
+                nx, ny = -1, 0
+            elif m == d_right: 
+                puck.x_in = r_max_x + puck.radius_in
+                nx, ny = 1, 0
+            elif m == d_top: 
+                puck.y_in = r_min_y - puck.radius_in
+                nx, ny = 0, -1
+            elif m == d_bottom: 
+                puck.y_in = r_max_y + puck.radius_in
+                nx, ny = 0, 1
+        else:
+            dist = math.sqrt(dist_sq)
+            overlap = puck.radius_in - dist
+            nx = dx / dist
+            ny = dy / dist
+            puck.x_in += nx * overlap
+            puck.y_in += ny * overlap
+
+        restitution = 0.7
+        vn = (puck.dx * nx) + (puck.dy * ny)
+        if vn < 0:
+            j = -(1 + restitution) * vn
+            puck.dx += j * nx
+            puck.dy += j * ny
+
+def is_touching_table(puck, board_len_in):
+    if (puck.x_in + puck.radius_in < 0) or \
+       (puck.x_in - puck.radius_in > board_len_in) or \
+       (puck.y_in + puck.radius_in < 0) or \
+       (puck.y_in - puck.radius_in > REAL_BOARD_WIDTH):
+        return False
+    return True
+
+def is_puck_stable(puck, board_len_in):
+    """A puck stays on the table while its center is within ~22% of a radius of the wood."""
+    tolerance = puck.radius_in * .22
+    
+    if puck.x_in < -tolerance or puck.x_in > board_len_in + tolerance:
+        return False
+    if puck.y_in < -tolerance or puck.y_in > REAL_BOARD_WIDTH + tolerance:
+        return False
+    return True
+
+def time_of_impact(p1, p2, max_t):
+    """
+    Earliest fraction of a frame (0..max_t) at which two pucks moving in a
+    straight line touch, or None. Pucks already touching and closing hit at 0.
+    """
+    px = p1.x_in - p2.x_in
+    py = p1.y_in - p2.y_in
+    vx = p1.dx - p2.dx
+    vy = p1.dy - p2.dy
+
+    b = (px * vx) + (py * vy)
+    if b >= 0:
+        return None # Separating (or not moving relative to each other)
+
+    min_dist = p1.radius_in + p2.radius_in
+    c = (px * px) + (py * py) - (min_dist * min_dist)
+    if c <= 0:
+        return 0.0
+
+    a = (vx * vx) + (vy * vy)
+    disc = (b * b) - (a * c)
+    if disc < 0:
+        return None
+
+    t = (-b - math.sqrt(disc)) / a
+    return t if t <= max_t else None
+
+def wall_time_of_impact(puck, min_x, max_x, min_y, max_y, max_t):
+    """Earliest (t, axis) at which a puck reaches one of the outer walls within max_t, or None."""
+    best = None
+    if puck.dx < 0:
+        t = (min_x + puck.radius_in - puck.x_in) / puck.dx
+        if t <= max_t: best, max_t = (max(t, 0.0), "x"), t
+    elif puck.dx > 0:
+        t = (max_x - puck.radius_in - puck.x_in) / puck.dx
+        if t <= max_t: best, max_t = (max(t, 0.0), "x"), t
+
+    if puck.dy < 0:
+        t = (min_y + puck.radius_in - puck.y_in) / puck.dy
+        if t <= max_t: best = (max(t, 0.0), "y")
+    elif puck.dy > 0:
+        t = (max_y - puck.radius_in - puck.y_in) / puck.dy
+        if t <= max_t: best = (max(t, 0.0), "y")
+    return best
+
+def resolve_contact(p1, p2, rng=random):
+    """
+    Impulse response for two pucks that are exactly touching (event engine).
+    Same restitution as check_puck_collision; overlap is only corrected if
+    the pucks started the frame interpenetrating.
+    """
+    dx = p1.x_in - p2.x_in
+    dy = p1.y_in - p2.y_in
+    dist = math.hypot(dx, dy)
+    if dist == 0:
+        angle = rng.uniform(0, 2 * math.pi)
+        nx, ny = math.cos(angle), math.sin(angle)
+    else:
+        nx, ny = dx / dist, dy / dist
+
+    overlap = (p1.radius_in + p2.radius_in) - dist
+    if overlap > 0.01:
+        correction = (overlap / 2) * 0.8
+        p1.x_in += nx * correction
+        p1.y_in += ny * correction
+        p2.x_in -= nx * correction
+        p2.y_in -= ny * correction
+
+    vel_along_normal = ((p1.dx - p2.dx) * nx) + ((p1.dy - p2.dy) * ny)
+    if vel_along_normal > 0:
+        return
+
+    restitution = 0.8
+    j = -(1 + restitution) * vel_along_normal
+    j /= 2 # Assuming equal mass
+
+    p1.dx += j * nx
+    p1.dy += j * ny
+    p2.dx -= j * nx
+    p2.dy -= j * ny
+
+    p1.is_moving = True
+    p2.is_moving = True
+
+def stopping_point(puck, friction):
+    """
+    Where a free puck comes to rest, in closed form.
+    Each frame moves the puck by its velocity and then scales the velocity by
+    `friction`, so after n frames it has travelled v * (1 - f^n) / (1 - f).
+    Returns (x_in, y_in, frames) with frames = the frame on which it stops.
+    """
+    speed = math.hypot(puck.dx, puck.dy)
+    if speed == 0:
+        return puck.x_in, puck.y_in, 0
+
+    frames = frames_to_stop(speed, friction)
+    travel = travel_factor(frames, friction)
+    return puck.x_in + puck.dx * travel, puck.y_in + puck.dy * travel, frames
+
+def frames_to_stop(speed, friction):
+    """The frame on which apply_friction stops a free puck: first n with speed * f^n < MIN_SPEED."""
+    if speed * friction < MIN_SPEED:
+        return 1
+    frames = max(1, math.ceil(math.log(MIN_SPEED / speed) / math.log(friction)))
+    while speed * friction ** frames >= MIN_SPEED: frames += 1
+    while frames > 1 and speed * friction ** (frames - 1) < MIN_SPEED: frames -= 1
+    return frames
+
+def travel_factor(frames, friction):
+    """Distance covered over `frames` frames per unit of starting speed."""
+    return (1 - friction ** frames) / (1 - friction)
+
+def segment_clears_point(x0, y0, x1, y1, px, py, clearance):
+    """True if the segment (x0, y0)-(x1, y1) never comes within `clearance` of (px, py)."""
+    sx = x1 - x0
+    sy = y1 - y0
+    seg_sq = (sx * sx) + (sy * sy)
+    if seg_sq == 0:
+        t = 0.0
+    else:
+        t = max(0.0, min(1.0, ((px - x0) * sx + (py - y0) * sy) / seg_sq))
+    cx = x0 + sx * t - px
+    cy = y0 + sy * t - py
+    return (cx * cx) + (cy * cy) > clearance * clearance
+
+# --- BROAD PHASE ---
+# Below this many pucks plain all-pairs is cheaper than building a grid
+BROAD_PHASE_MIN_PUCKS = 16
+
+# Forward neighbour cells, so each pair of cells is visited once
+_NEIGHBOUR_CELLS = ((1, 0), (-1, 1), (0, 1), (1, 1))
+
+def _hash_grid(pucks, cell):
+    grid = {}
+    for i, p in enumerate(pucks):
+        key = (math.floor(p.x_in / cell), math.floor(p.y_in / cell))
+        bucket = grid.get(key)
+        if bucket is None: grid[key] = [i]
+        else: bucket.append(i)
+    return grid
+
+def _cell_size(pucks, margin):
+    return 2 * max(p.radius_in for p in pucks) + margin
+
+def candidate_pairs(pucks, margin=0.1):
+    """
+    Index pairs (i, j), i < j, of pucks that may be touching.
+    Pucks are hashed into a uniform grid of cells one diameter (+ margin)
+    wide, so only pucks in the same or adjacent cells are paired. Pairs
+    come back in the same order as the all-pairs loop they replace.
+    `margin` widens the reach for checks with extra clearance or motion.
+    """
+    n = len(pucks)
+    if n < BROAD_PHASE_MIN_PUCKS:
+        return [(i, j) for i in range(n) for j in range(i + 1, n)]
+
+    grid = _hash_grid(pucks, _cell_size(pucks, margin))
+    pairs = []
+    for (cx, cy), bucket in grid.items():
+        for a in range(len(bucket)):
+            for b in range(a + 1, len(bucket)):
+                pairs.append((bucket[a], bucket[b]))
+        for (ox, oy) in _NEIGHBOUR_CELLS:
+            other = grid.get((cx + ox, cy + oy))
+            if other is None: continue
+            for i in bucket:
+                for j in other:
+                    pairs.append((i, j) if i < j else (j, i))
+    pairs.sort()
+    return pairs
+
+def candidate_cross_pairs(group_a, group_b, margin=0.1):
+    """Like candidate_pairs, but (i, j) pairs a puck of group_a with one of group_b."""
+    if len(group_a) + len(group_b) < BROAD_PHASE_MIN_PUCKS:
+        return [(i, j) for i in range(len(group_a)) for j in range(len(group_b))]
+    if not group_a or not group_b:
+        return []
+
+    cell = max(_cell_size(group_a, margin), _cell_size(group_b, margin))
+    grid = _hash_grid(group_b, cell)
+    pairs = []
+    for i, p in enumerate(group_a):
+        cx = math.floor(p.x_in / cell)
+        cy = math.floor(p.y_in / cell)
+        for ox in (-1, 0, 1):
+            for oy in (-1, 0, 1):
+                bucket = grid.get((cx + ox, cy + oy))
+                if bucket is None: continue
+                for j in bucket:
+                    pairs.append((i, j))
+    pairs.sort()
+    return pairs
@@ -0,0 +1,81 @@
+import csv
+import time
+from collections import deque
+
+# Phases of one frame, in the order they run. Collisions are carved out of
+# physics and idle is the wait in clock.tick, so the rest add up to the
+# work done in a frame.
+PHASES = ("input", "physics", "collisions", "scoring", "turn_end", "draw", "flip", "idle")
+
+# Frames kept for the rolling mean / p99
+PROFILE_WINDOW = 120
+
+clock = time.perf_counter
+
+class FrameProfiler:
+    """
+    Wall time per frame phase. Callers only time anything while it is
+    enabled; when it is off the game keeps no reference to it in its hot
+    loops, so the cost is one check per phase.
+    """
+    def __init__(self, window=PROFILE_WINDOW):
+        self.enabled = False
+        self.history = {phase: deque(maxlen=window) for phase in PHASES}
+        self.totals = deque(maxlen=window)
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.frame = 0
+        self._csv_file = None
+        self._csv = None
+
+    def lap(self, phase, since):
+        """Adds the time since `since` to a phase and returns now, for the next lap."""
+        now = clock()
+        self.current[phase] += now - since
+        return now
+
+    def carve(self, phase, parent, seconds):
+        """Moves time already inside the parent's lap into its own phase."""
+        self.current[phase] += seconds
+        self.current[parent] -= seconds
+
+    def end_frame(self):
+        current = self.current
+        self.frame += 1
+        for phase in PHASES:
+            self.history[phase].append(current[phase])
+        self.totals.append(sum(current[phase] for phase in PHASES if phase != "idle"))
+        if self._csv:
+            self._csv.writerow([self.frame] + [f"{current[phase] * 1000:.4f}" for phase in PHASES])
+        for phase in PHASES:
+            current[phase] = 0.0
+
+    def stats(self, phase=None):
+        """Rolling (mean, p99) in milliseconds for a phase, or the whole frame's work if None."""
+        values = self.totals if phase is None else self.history[phase]
+        if not values: return 0.0, 0.0
+        ordered = sorted(values)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        return sum(ordered) / len(ordered) * 1000, p99 * 1000
+
+    def reset(self):
+        for phase in PHASES:
+            self.history[phase].clear()
+            self.current[phase] = 0.0
+        self.totals.clear()
+
+    def start_csv(self, path):
+        """Streams every frame's phase times (ms) to a CSV file until close()."""
+        self.close()
+        self._csv_file = open(path, 'w', newline='')
+        self._csv = csv.writer(self._csv_file)
+        self._csv.writerow(["frame"] + [f"{phase}_ms" for phase in PHASES])
+
+    @property
+    def streaming(self):
+        return self._csv is not None
+
+    def close(self):
+        if self._csv_file:
+            self._csv_file.close()
+        self._csv_file = None
+        self._csv = None
@@ -0,0 +1,364 @@
+import os
+import random
+import re
+import struct
+from . import physics
+from .sim import ShuffleboardSim, GameState, ENGINE_SUBSTEP
+from .constants import TABLE_FRICTION, P1, P2, \
+                       STATE_GUTTER, STATE_READY, STATE_SELECTED, STATE_THROWN, STATE_ON_BOARD
+
+# A replay stores actions, not frames: the game's starting position and
+# RNG seed, then one small record per throw (or other input that changes
+# the sim), stamped with the frame it happened on. Re-simulating those
+# inputs reproduces the game.
+#
+#   header  magic, version
+#   'S'     start: settings, game seed, round-over delay, walls, then the
+#           game state (round, turn, scores, ...) and one record per puck
+#           in slot order
+#   'T'     throw: frame, slot, release x/y, dx, dy, counted
+#   'P'     drop: frame, slot, x/y, state (a cancelled throw put back down)
+#   'N'     frame (the gutter-reset button)
+#   'M'     nudge: frame, slot, x/y, dx, dy, is_moving (a table puck shoved
+#           by a held puck while it was dragged)
+#
+# Gutter pucks pushed around by a held puck are not recorded; they cannot
+# reach the table. Free play after the game is over is not recorded at all.
+REPLAY_MAGIC = b"SHFR"
+REPLAY_VERSION = 3
+
+# Replays kept in the default folder; the oldest are deleted past this
+MAX_REPLAYS = 100
+_REPLAY_NAME = re.compile(r"game_(\d+)\.shfr")
+
+_HEADER = struct.Struct("<4sB")
+_START = struct.Struct("<dd i? iQ dddd QI BBBB?Bi iiiiB H")
+_PUCK = struct.Struct("<BB??dddd")
+_THROW = struct.Struct("<QBdddd?")
+_DROP = struct.Struct("<QBddB")
+_FRAME = struct.Struct("<Q")
+_NUDGE = struct.Struct("<QBdddd?")
+
+_PLAYERS = (None, P1, P2)
+_PUCK_STATES = (STATE_GUTTER, STATE_READY, STATE_SELECTED, STATE_THROWN, STATE_ON_BOARD)
+_GAME_STATES = ("AIMING", "MOVING", "ROUND_OVER_DELAY")
+
+class ReplayRecorder:
+    """
+    Appends a game's inputs to a replay file as they happen. start() begins
+    a new recording from the sim's current position under a fresh game
+    seed, so the random draws of the rest of the game can be reproduced.
+    The file is only created once the first input is recorded, so games
+    nobody plays leave nothing behind.
+    """
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.path = None
+        self._file = None
+        # Header and start record of a recording with no file yet
+        self._start = None
+        # Next game_NNNNN number in the default folder, found once per recorder
+        self._next_index = None
+
+    def start(self, sim, path=None, seed=None):
+        self.close()
+        if seed is None:
+            seed = random.randrange(2 ** 63)
+        sim.reseed(seed)
+        for i, p in enumerate(sim.pucks):
+            p.slot = i
+
+        self.path = path
+        self._start = _HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION) + b"S" + _pack_start(sim, seed)
+
+    def throw(self, sim, puck, dx, dy, count_throw=True):
+        self._write(b"T" + _THROW.pack(sim.frame, puck.slot, puck.x_in, puck.y_in, dx, dy, count_throw))
+
+    def drop(self, sim, puck):
+        self._write(b"P" + _DROP.pack(sim.frame, puck.slot, puck.x_in, puck.y_in,
+                                      _PUCK_STATES.index(puck.state)))
+
+    def reset_non_scoring(self, sim):
+        self._write(b"N" + _FRAME.pack(sim.frame))
+
+    def nudge(self, sim, pucks):
+        self._write(b"".join(b"M" + _NUDGE.pack(sim.frame, p.slot, p.x_in, p.y_in, p.dx, p.dy, p.is_moving)
+                             for p in pucks))
+
+    def close(self):
+        self._start = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, data):
+        """Appends records, creating the file with its start record on the first one."""
+        if self._file is None:
+            if self._start is None: return
+            try:
+                if self.path is None:
+                    self.path = self._next_path()
+                self._file = open(self.path, 'wb')
+            except OSError as e:
+                print(f"Failed to record replay: {e}")
+                self._start = None
+                return
+            self._file.write(self._start)
+            self._start = None
+        self._file.write(data)
+        self._file.flush()
+
+    def _next_path(self):
+        """A fresh game_NNNNN.shfr in the replay folder, pruning it to the newest MAX_REPLAYS."""
+        directory = self.directory or default_replay_dir()
+        os.makedirs(directory, exist_ok=True)
+        replays = sorted((int(m.group(1)), name) for m, name in
+                         ((_REPLAY_NAME.fullmatch(name), name) for name in os.listdir(directory)) if m)
+        if self._next_index is None:
+            self._next_index = replays[-1][0] + 1 if replays else 0
+        # Room for the new one
+        for _, name in replays[:max(0, len(replays) - MAX_REPLAYS + 1)]:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+        path = os.path.join(directory, f"game_{self._next_index:05d}.shfr")
+        self._next_index += 1
+        return path
+
+def default_replay_dir():
+    from .memory import get_data_path
+    return os.path.join(os.path.dirname(get_data_path()), "replays")
+
+def _pack_start(sim, seed):
+    s = sim.scores
+    parts = [_START.pack(
+        sim.board_length_ft, sim.puck_size, sim.target_score, sim.edging_enabled,
+        sim.round_delay_frames, seed, *sim.bounds, sim.frame, sim.round_number,
+        _PLAYERS.index(sim.current_turn), _PLAYERS.index(sim.round_winner),
+        sim.throws_left[P1], sim.throws_left[P2], sim.game_over,
+        _GAME_STATES.index(sim.game_state), sim.round_delay_left,
+        s.p1_score, s.p2_score, s.round_points[P1], s.round_points[P2], _PLAYERS.index(s.game_winner),
+        len(sim.pucks)
+    )]
+    for p in sim.pucks:
+        parts.append(_PUCK.pack(_PLAYERS.index(p.owner), _PUCK_STATES.index(p.state), p.is_moving,
+                                p.sleeping, p.x_in, p.y_in, p.dx, p.dy))
+    return b"".join(parts)
+
+class Replay:
+    """A parsed replay: starting settings/state plus the list of recorded inputs."""
+    def __init__(self, settings, seed, round_delay_frames, bounds, state, events):
+        self.settings = settings
+        self.seed = seed
+        self.round_delay_frames = round_delay_frames
+        self.bounds = bounds
+        self.state = state
+        self.events = events
+
+    @property
+    def throws(self):
+        return [e for e in self.events if e[0] == "T"]
+
+def load_replay(path):
+    with open(path, 'rb') as f:
+        buf = f.read()
+
+    magic, version = _HEADER.unpack_from(buf, 0)
+    if magic != REPLAY_MAGIC:
+        raise ValueError("Not a shuffleboard replay")
+    if version != REPLAY_VERSION:
+        raise ValueError(f"Unsupported replay version {version}")
+    pos = _HEADER.size
+    if buf[pos:pos + 1] != b"S":
+        raise ValueError("Replay has no start record")
+    pos += 1
+
+    (length, puck_size, target, edging, delay, seed, min_x, max_x, min_y, max_y, frame, round_number,
+     turn, round_winner, t1, t2, game_over, game_state, delay_left,
+     p1_score, p2_score, round_p1, round_p2, winner, count) = _START.unpack_from(buf, pos)
+    pos += _START.size
+
+    state = GameState()
+    state.settings = (int(length) if length.is_integer() else length, puck_size, target, edging)
+    state.pucks = []
+    for _ in range(count):
+        owner, puck_state, moving, sleeping, x, y, dx, dy = _PUCK.unpack_from(buf, pos)
+        pos += _PUCK.size
+        state.pucks.append((_PLAYERS[owner], x, y, dx, dy, moving, _PUCK_STATES[puck_state], sleeping))
+    state.throws_left = (t1, t2)
+    state.current_turn = _PLAYERS[turn]
+    state.round_winner = _PLAYERS[round_winner]
+    state.game_over = game_over
+    state.game_state = _GAME_STATES[game_state]
+    state.round_delay_left = delay_left
+    state.frame = frame
+    state.round_number = round_number
+    state.scores = (p1_score, p2_score, round_p1, round_p2, _PLAYERS[winner])
+    state.rng_state = None
+
+    # Events; a truncated last record (crash mid-write) is ignored
+    events = []
+    while pos < len(buf):
+        kind = buf[pos:pos + 1]
+        pos += 1
+        if kind == b"T" and pos + _THROW.size <= len(buf):
+            f, slot, x, y, dx, dy, counted = _THROW.unpack_from(buf, pos)
+            events.append(("T", f, slot, x, y, dx, dy, counted))
+            pos += _THROW.size
+        elif kind == b"P" and pos + _DROP.size <= len(buf):
+            f, slot, x, y, puck_state = _DROP.unpack_from(buf, pos)
+            events.append(("P", f, slot, x, y, _PUCK_STATES[puck_state]))
+            pos += _DROP.size
+        elif kind == b"N" and pos + _FRAME.size <= len(buf):
+            events.append(("N",) + _FRAME.unpack_from(buf, pos))
+            pos += _FRAME.size
+        elif kind == b"M" and pos + _NUDGE.size <= len(buf):
+            events.append(("M",) + _NUDGE.unpack_from(buf, pos))
+            pos += _NUDGE.size
+        else:
+            break
+
+    return Replay(state.settings, seed, delay, (min_x, max_x, min_y, max_y), state, events)
+
+class ReplayPlayer:
+    """
+    Re-simulates a replay on a headless sim. run() goes as fast as the CPU
+    allows; step() advances one frame at a time for rendering.
+    """
+    def __init__(self, replay, sim=None, engine=ENGINE_SUBSTEP):
+        if not isinstance(replay, Replay):
+            replay = load_replay(replay)
+        self.replay = replay
+
+        if sim is None:
+            sim = ShuffleboardSim(*replay.settings, round_delay_frames=replay.round_delay_frames,
+                                  seed=replay.seed, engine=engine)
+        else:
+            sim.round_delay_frames = replay.round_delay_frames
+        sim.pucks.clear()
+        sim.restore(replay.state)
+        sim.bounds = replay.bounds
+        for i, p in enumerate(sim.pucks):
+            p.slot = i
+        sim.reseed(replay.seed)
+        self.sim = sim
+        self.next_event = 0
+
+    @property
+    def done(self):
+        return self.next_event >= len(self.replay.events) and self._idle()
+
+    def _idle(self):
+        # Nothing can change until the next input: no turn or round to
+        # resolve and every puck asleep
+        sim = self.sim
+        return sim.game_state not in ("MOVING", "ROUND_OVER_DELAY") and \
+               not any(p.is_awake() for p in sim.pucks)
+
+    def _apply_due_events(self):
+        sim = self.sim
+        events = self.replay.events
+        while self.next_event < len(events) and events[self.next_event][1] <= sim.frame:
+            e = events[self.next_event]
+            self.next_event += 1
+            if e[0] == "N":
+                sim.reset_non_scoring_pucks()
+                continue
+
+            puck = self._puck(e[2])
+            if puck is None: continue
+            if e[0] == "M":
+                puck.x_in, puck.y_in, puck.dx, puck.dy, puck.is_moving = e[3:]
+                puck.sleeping = False
+                continue
+            # Picking a puck up moves it to the top of the list, which sets collision order
+            sim.pucks.remove(puck)
+            sim.pucks.append(puck)
+            puck.set_pos(e[3], e[4])
+            if e[0] == "T":
+                sim.throw(puck, e[5], e[6], e[7])
+            else:
+                puck.dx = 0; puck.dy = 0
+                puck.is_moving = False
+                puck.state = e[5]
+
+    def _puck(self, slot):
+        for p in self.sim.pucks:
+            if p.slot == slot:
+                return p
+        return None
+
+    def step(self):
+        """Applies any inputs due this frame, then advances one frame."""
+        self._apply_due_events()
+        self.sim.step()
+
+    def run(self, max_frames=10 ** 7):
+        """Plays the whole replay headlessly. Returns the sim in its final state."""
+        sim = self.sim
+        events = self.replay.events
+        limit = sim.frame + max_frames
+        while not self.done and sim.frame < limit:
+            self._apply_due_events()
+            target = events[self.next_event][1] if self.next_event < len(events) else None
+
+            if self._idle():
+                # Skip the idle frames up to the next input
+                if target is None: break
+                sim.frame = target
+                continue
+
+            # Likewise the pause before a round is scored, once the board is still
+            if sim.game_state == "ROUND_OVER_DELAY" and not sim.game_over and \
+               not any(p.is_awake() for p in sim.pucks):
+                wait = sim.round_delay_left if target is None else min(sim.round_delay_left, target - sim.frame)
+                if wait > 0:
+                    sim.frame += wait
+                    sim.round_delay_left -= wait
+                    continue
+
+            # Coast a lone puck to rest if it stops before the next input
+            # (the closed-form skip is not bit-exact, so only for the substep engine)
+            movers = [p for p in sim.pucks if p.is_moving]
+            if len(movers) == 1 and sim.engine == ENGINE_SUBSTEP:
+                _, _, frames = physics.stopping_point(movers[0], TABLE_FRICTION)
+                if (target is None or sim.frame + frames + 1 <= target) and sim.skip_to_rest(exact=True):
+                    continue
+            sim.step()
+        return sim
+
+def play(path, speed=1.0):
+    """Opens a window and shows a replay; speed is a multiple of real time."""
+    import pygame
+    from .game import Shuffleboard
+    from .constants import RENDER_FPS_CAP, PHYSICS_HZ
+
+    game = Shuffleboard(record=False)
+    sim = game.sim
+    sim.on_turn_end = sim.on_game_over = None
+
+    replay = load_replay(path)
+    game.board_length_ft, game.puck_size = replay.settings[0], replay.settings[1]
+    game.gutter.puck_size = game.puck_size
+    game.state = "GAME"
+    game.update_dimensions()
+    # The walls come from the recording, whatever this window's size
+    player = ReplayPlayer(replay, sim=sim)
+    game._update_all_pucks_visuals()
+
+    owed = 0.0
+    running = True
+    while running and not player.done:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+        owed += speed * PHYSICS_HZ / RENDER_FPS_CAP
+        while owed >= 1:
+            player.step()
+            owed -= 1
+        game.draw()
+        game.present()
+        game.clock.tick(RENDER_FPS_CAP)
+    pygame.quit()
+    return sim
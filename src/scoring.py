@@ -0,0 +1,83 @@
+from .constants import STATE_ON_BOARD, STATE_THROWN, STATE_SELECTED, P1, P2
+
+# Distance from the far end to a puck's trailing edge for 3, 2 and 1 points
+LINE_3_IN, LINE_2_IN, LINE_1_IN = 6, 12, 72
+
+def puck_points(x_in, radius_in, board_len_in, edging_enabled):
+    """Zone value of one scoring puck: 4 if hanging over the end (edging on), else 3/2/1/0."""
+    if edging_enabled and x_in + radius_in > board_len_in: return 4
+    left_edge = board_len_in - x_in + radius_in
+    if left_edge < LINE_3_IN: return 3
+    if left_edge < LINE_2_IN: return 2
+    if left_edge < LINE_1_IN: return 1
+    return 0
+
+class ScoreKeeper:
+    """
+    Pure scoring rules and running totals (no pygame).
+    The Scoreboard component extends this with drawing.
+    """
+    def __init__(self):
+        self.p1_score = 0
+        self.p2_score = 0
+        self.round_points = {P1: 0, P2: 0}
+        self.game_winner = None
+
+    def reset(self):
+        self.p1_score = 0
+        self.p2_score = 0
+        self.round_points = {P1: 0, P2: 0}
+        self.game_winner = None
+
+    def calculate_points(self, active_pucks, board_length_ft, edging_enabled, game_over):
+        """
+        Round points for the pucks on the table. Only the player with the
+        furthest puck scores: one zone value for each of their pucks that is
+        further than the opponent's best. A tie at the top scores nothing.
+        """
+        best = {P1: None, P2: None}
+        valid = []
+        for p in active_pucks:
+            if p.state in (STATE_ON_BOARD, STATE_THROWN) or (game_over and p.state == STATE_SELECTED):
+                valid.append(p)
+                b = best[p.owner]
+                if b is None or p.x_in > b: best[p.owner] = p.x_in
+
+        points = {P1: 0, P2: 0}
+        if not valid:
+            self.round_points = points
+            return
+
+        if best[P2] is None or (best[P1] is not None and best[P1] > best[P2]):
+            leader, opponent_best = P1, best[P2]
+        else:
+            leader, opponent_best = P2, best[P1]
+
+        board_len_in = board_length_ft * 12
+        pts = 0
+        for p in valid:
+            if p.owner == leader and (opponent_best is None or p.x_in > opponent_best):
+                pts += puck_points(p.x_in, p.radius_in, board_len_in, edging_enabled)
+
+        points[leader] = pts
+        self.round_points = points
+
+    def commit_round(self, target_score):
+        if self.game_winner:
+            return self.game_winner, True
+
+        self.p1_score += self.round_points[P1]
+        self.p2_score += self.round_points[P2]
+        
+        round_winner = None
+        if self.round_points[P2] > 0: round_winner = P2
+        elif self.round_points[P1] > 0: round_winner = P1
+        
+        self.round_points = {P1: 0, P2: 0}
+        
+        if (self.p1_score >= target_score or self.p2_score >= target_score) and \
+           (self.p1_score != self.p2_score):
+            self.game_winner = P1 if self.p1_score > self.p2_score else P2
+            return self.game_winner, True
+            
+        return round_winner, False
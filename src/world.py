@@ -0,0 +1,52 @@
+from . import physics
+from .constants import REAL_BOARD_WIDTH, FOUL_LINE_FT, THROW_LINE_FT, DEFAULT_LENGTH_FT, \
+                       GUTTER_LEFT_IN, GUTTER_RIGHT_IN, GUTTER_Y_IN, SCORE_GAP_IN, SCOREBOARD_W_IN
+
+def default_bounds(board_length_ft):
+    """Play area (min_x, max_x, min_y, max_y) in inches for a window that exactly fits the layout."""
+    board_in = board_length_ft * 12
+    return (
+        -GUTTER_LEFT_IN,
+        board_in + SCORE_GAP_IN + SCOREBOARD_W_IN + GUTTER_RIGHT_IN,
+        -GUTTER_Y_IN,
+        REAL_BOARD_WIDTH + GUTTER_Y_IN
+    )
+
+class World:
+    """
+    Geometry of one game, in inches from the top-left corner of the wood:
+    the table, the throw and foul lines, and the outer walls of the gutter.
+    Nothing here depends on the window; pixels only exist when drawing.
+    """
+    width = REAL_BOARD_WIDTH
+
+    def __init__(self, board_length_ft=DEFAULT_LENGTH_FT, bounds=None):
+        self.board_length_ft = board_length_ft
+        self._bounds = tuple(bounds) if bounds is not None else None
+
+    @property
+    def bounds(self):
+        """Outer walls (min_x, max_x, min_y, max_y); the standard layout unless overridden."""
+        return self._bounds or default_bounds(self.board_length_ft)
+
+    @bounds.setter
+    def bounds(self, value):
+        self._bounds = tuple(value) if value is not None else None
+
+    @property
+    def board_len_in(self):
+        return self.board_length_ft * 12
+
+    @property
+    def throw_line_in(self):
+        return THROW_LINE_FT * 12
+
+    @property
+    def foul_line_in(self):
+        return (self.board_length_ft - FOUL_LINE_FT) * 12
+
+    def is_touching_table(self, puck):
+        return physics.is_touching_table(puck, self.board_len_in)
+
+    def is_puck_stable(self, puck):
+        return physics.is_puck_stable(puck, self.board_len_in)